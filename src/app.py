@@ -19,6 +19,10 @@ sys.path.insert(0, parent_dir)
 from src.models.ChatHistoryModel import ChatHistoryModel
 from src.models.VectorStoreModel import VectorStoreModel
 from src.modules.llm.LLMProviderFactory import LLMProviderFactory
+from src.modules.llm.PromptTemplate import PromptTemplate
+from src.modules.llm.ContextPacker import get_encoding
+from src.modules.rag.course_catalog import CourseCatalog
+from src.modules.cache.translation_cache import TranslationCache
 from src.helpers.config import get_settings
 from src.routes.chat import answer
 from src.helpers.config import get_settings
@@ -37,6 +41,9 @@ chat_history_model = None
 vector_store = None
 mongo_conn = None
 qdrant_client = None
+course_catalog = None
+prompt_template = None
+translation_cache = None
 
 def get_or_create_eventloop():
     try:
@@ -73,7 +80,7 @@ async def connect_to_qdrant():
         raise
 
 async def initialize_app():
-    global llm, chat_history_model, vector_store, mongo_conn, qdrant_client
+    global llm, chat_history_model, vector_store, mongo_conn, qdrant_client, course_catalog, prompt_template, translation_cache
     
     logger.info("Starting Fusion-Ed initialization")
     settings = get_settings()
@@ -89,6 +96,11 @@ async def initialize_app():
         # Initialize models
         vector_store = await VectorStoreModel.create_instance(qdrant_client)
         chat_history_model = await ChatHistoryModel.create_instance(mongo_client)
+        course_catalog = CourseCatalog(vector_store)
+        await course_catalog.load()
+        prompt_template = PromptTemplate()
+        await asyncio.to_thread(get_encoding, settings.CONTEXT_TOKEN_ENCODING)
+        translation_cache = TranslationCache()
 
         # Initialize LLM
         llm_factory = LLMProviderFactory()
@@ -104,6 +116,8 @@ async def initialize_app():
 async def cleanup():
     global mongo_conn, qdrant_client
     logger.info("Cleaning up Fusion-Ed resources")
+    if chat_history_model:
+        await chat_history_model.close()
     if mongo_conn:
         mongo_conn.close()
     if qdrant_client:
@@ -124,7 +138,9 @@ def initialize_session_state():
 async def send_message(message: str) -> str:
     """Send a message to the chat endpoint and get the response."""
     try:
-        response = await answer(message, st.session_state.user_id, st.session_state.chat_id, llm, chat_history_model, vector_store)
+        response = await answer(message, st.session_state.user_id, st.session_state.chat_id, llm, chat_history_model, vector_store,
+                                prompt_template=prompt_template, course_catalog=course_catalog,
+                                translation_cache=translation_cache)
         return response.answer
     except Exception as e:
         logger.error(f"Error sending message: {e}")
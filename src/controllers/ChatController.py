@@ -1,15 +1,25 @@
 from typing import List
 from src.controllers.BaseController import BaseController
-from src.models.schemas.ChatHistorySchema import ChatHistorySchema, Metadata
+from src.models.schemas.ChatHistorySchema import ChatHistorySchema, ChunkReference, Metadata
 from src.modules.rag.embedding import Embedding
+from src.modules.llm.PromptTemplate import PromptTemplate
+from src.modules.llm.ContextPacker import ContextPacker
 import uuid
+import time
+import asyncio
+import hashlib
 from datetime import datetime
-import os
+from difflib import SequenceMatcher
 
 
 
 class ChatController(BaseController):
-    def __init__(self, llm, chat_history_model, vector_store, query_translator):
+    # Worst-case section headers added around documents and history, counted against the budget
+    CONTEXT_HEADERS = "##Notes on Documents:\nGiven context is weakly relevant to the question,\n" + \
+        "##Relevant Documents:\n##Chat History:\n"
+
+    def __init__(self, llm, chat_history_model, vector_store, query_translator=None, answer_cache=None,
+                 prompt_template=None, course_catalog=None, reranker=None):
         super().__init__()
         self.llm = llm
         self.chat_history_model = chat_history_model
@@ -17,40 +27,176 @@ class ChatController(BaseController):
         self.embedding_model = Embedding()
         self.chat_id = str(uuid.uuid4())
         self.query_translator = query_translator
+        self.answer_cache = answer_cache
+        self.prompt_template = prompt_template or PromptTemplate()
+        self.course_catalog = course_catalog
+        self.reranker = reranker
+        self.cached_answer = None
+        self.similar_chunks = []
+        self.course_id = None
+        self.file_id = None
 
-    async def generate_response(self, question: str, user_id: str, chat_id: str):
+    async def generate_response(self, question: str, user_id: str, chat_id: str, course_id: str = None, file_id: str = None):
         try:
-            self.user_id = user_id
-            self.chat_id = chat_id
-            
-            # Get chat history first
-            chat_history = await self.get_chat_history(user_id)
-            
-            # Translate the query using chat history context
-            translated_question = await self.query_translator.translate_query(question, chat_history)
-            self.logger.info(f"Original question: {question}")
-            self.logger.info(f"Translated question: {translated_question}")
-            
-            # Use translated question for similarity search
-            similar_chunks = await self.get_similar_chunks(translated_question)
-            courses = await self.get_courses()
-            llm_entry = await self.construct_prompt(question, similar_chunks, chat_history, courses)
+            llm_entry = await self.prepare_llm_entry(question, user_id, chat_id, course_id, file_id)
+
+            if self.cached_answer is not None:
+                await self.save_chat_history(question, self.cached_answer)
+                return self.cached_answer
 
             response = await self.llm.generate_response(llm_entry)
+            await self.cache_answer(response, time.perf_counter() - self.started_at)
             await self.save_chat_history(question, response)
             return response
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
             raise e
-    
-    async def get_chat_history(self, user_id: str):
+
+    async def stream_response(self, question: str, user_id: str, chat_id: str, course_id: str = None, file_id: str = None):
+        try:
+            llm_entry = await self.prepare_llm_entry(question, user_id, chat_id, course_id, file_id)
+
+            if self.cached_answer is not None:
+                yield self.cached_answer
+                await self.save_chat_history(question, self.cached_answer)
+                return
+
+            tokens = []
+            async for token in self.llm.stream_response(llm_entry):
+                tokens.append(token)
+                yield token
+
+            # Persist only once the whole answer has been streamed
+            answer = "".join(tokens)
+            await self.cache_answer(answer, time.perf_counter() - self.started_at)
+            await self.save_chat_history(question, answer)
+        except Exception as e:
+            self.logger.error(f"Error streaming response: {e}")
+            raise e
+
+    async def prepare_llm_entry(self, question: str, user_id: str, chat_id: str, course_id: str = None, file_id: str = None):
+        self.user_id = user_id
+        self.chat_id = chat_id
+        # Optional search scope, e.g. a learner asking from inside one course
+        self.course_id = course_id
+        self.file_id = file_id
+        self.started_at = time.perf_counter()
+
+        if self.settings.CHAT_PIPELINED_RETRIEVAL:
+            chat_history, similar_chunks, courses = await self.retrieve_context_pipelined(question, user_id, chat_id)
+        else:
+            chat_history, similar_chunks, courses = await self.retrieve_context(question, user_id, chat_id)
+
+        if self.cached_answer is not None:
+            return None
+
+        similar_chunks = await self.rerank_chunks(self.translated_question, similar_chunks)
+        return await self.construct_prompt(question, similar_chunks, chat_history, courses)
+
+    async def retrieve_context(self, question: str, user_id: str, chat_id: str):
+        # Get chat history first
+        chat_history = await self.get_chat_history(user_id, chat_id)
+
+        # Translate the query using chat history context
+        translated_question = await self.translate_query(question, chat_history)
+        self.logger.info(f"Original question: {question}")
+        self.logger.info(f"Translated question: {translated_question}")
+        self.translated_question = translated_question
+
+        courses = await self.get_courses()
+        question_vector = await self.embedding_model.embed_query(translated_question)
+        if await self.get_cached_answer(question_vector, courses):
+            return chat_history, self.similar_chunks, courses
+
+        # Use translated question for similarity search
+        similar_chunks = await self.get_similar_chunks(translated_question, question_vector)
+        return chat_history, similar_chunks, courses
+
+    async def retrieve_context_pipelined(self, question: str, user_id: str, chat_id: str):
+        # Search on the raw question while the translation round trip is in flight
+        speculative_task = asyncio.create_task(self.get_similar_chunks(question))
+
         try:
-            chat_history = await self.chat_history_model.get_chat_history(user_id)
+            chat_history = await self.get_chat_history(user_id, chat_id)
+            translated_question = await self.translate_query(question, chat_history)
+            self.logger.info(f"Original question: {question}")
+            self.logger.info(f"Translated question: {translated_question}")
+            self.translated_question = translated_question
+
+            if await self.is_similar_query(question, translated_question):
+                self.logger.info("Reusing speculative search results")
+                similar_chunks = await speculative_task
+                courses = await self.get_courses()
+                if await self.get_cached_answer(self.query_vector, courses):
+                    return chat_history, self.similar_chunks, courses
+            else:
+                speculative_task.cancel()
+                question_vector = await self.embedding_model.embed_query(translated_question)
+                courses = await self.get_courses()
+                if await self.get_cached_answer(question_vector, courses):
+                    return chat_history, self.similar_chunks, courses
+                similar_chunks = await self.get_similar_chunks(translated_question, question_vector)
+
+            return chat_history, similar_chunks, courses
+        finally:
+            if not speculative_task.done():
+                speculative_task.cancel()
+
+    async def translate_query(self, question: str, chat_history: list) -> str:
+        if not self.query_translator:
+            return question
+        return await self.query_translator.translate_query(question, chat_history)
+
+    async def is_similar_query(self, question: str, translated_question: str) -> bool:
+        original = " ".join(question.lower().split())
+        translated = " ".join(translated_question.lower().split())
+        if original == translated:
+            return True
+        ratio = SequenceMatcher(None, original, translated).ratio()
+        return ratio >= self.settings.SPECULATIVE_SEARCH_SIMILARITY
+
+    async def get_catalog_version(self, courses: list) -> str:
+        if self.course_catalog:
+            return self.course_catalog.version
+        return hashlib.sha1("\n".join(sorted(courses)).encode("utf-8")).hexdigest()
+
+    async def get_cached_answer(self, question_vector: List[float], courses: list) -> bool:
+        self.query_vector = question_vector
+        # Scoped searches see different chunks, so the scope is part of the cache key
+        self.catalog_version = f"{await self.get_catalog_version(courses)}:{self.course_id or ''}:{self.file_id or ''}"
+        if not self.answer_cache:
+            return False
+
+        entry = await self.answer_cache.lookup(question_vector, self.catalog_version)
+        if entry is None:
+            return False
+
+        self.cached_answer = entry["answer"]
+        self.similar_chunks = entry["similar_chunks"]
+        await self.answer_cache.record_saved_latency(entry["latency"] - (time.perf_counter() - self.started_at))
+        self.logger.info("Answer served from semantic cache")
+        return True
+
+    async def cache_answer(self, answer: str, latency: float):
+        if not self.answer_cache:
+            return
+        await self.answer_cache.store(self.query_vector, self.catalog_version, answer, self.similar_chunks, latency)
+
+    async def get_chat_history(self, user_id: str, chat_id: str):
+        try:
+            chat_history = await self.chat_history_model.get_chat_history(user_id, chat_id)
             # self.logger.info(f"Chat history: {chat_history}")
             return chat_history
         except Exception as e:
             self.logger.error(f"Error getting chat history: {e}")
             raise e
+
+    async def get_chat_history_page(self, user_id: str, chat_id: str, limit: int = 10, cursor: str = None):
+        try:
+            return await self.chat_history_model.get_chat_history_page(user_id, chat_id, limit, cursor)
+        except Exception as e:
+            self.logger.error(f"Error getting chat history page: {e}")
+            raise e
     
     async def save_chat_history(self, question: str, answer: str):
         try:
@@ -60,7 +206,9 @@ class ChatController(BaseController):
                 question=question,
                 answer=answer,
                 metadata=Metadata(
-                    similar_chunks=self.similar_chunks,
+                    similar_chunks=[
+                        ChunkReference(id=chunk["id"], score=chunk["score"]) for chunk in self.similar_chunks
+                    ],
                     timestamp=datetime.utcnow()
                 )
             )
@@ -69,116 +217,57 @@ class ChatController(BaseController):
             self.logger.error(f"Error saving chat history: {e}")
             raise e
     
-    async def get_similar_chunks(self, question: str):
+    async def get_similar_chunks(self, question: str, question_vector: List[float] = None):
         try:
-            question_vector = await self.embedding_model.embed_query(question)
-            similar_chunks = await self.vector_store.search_similar_chunks(question_vector)
+            if question_vector is None:
+                question_vector = await self.embedding_model.embed_query(question)
+            self.query_vector = question_vector
+            # Retrieve wide when a reranker will narrow the candidates down afterwards
+            limit = self.settings.RERANKER_CANDIDATES if self.reranker else self.settings.RETRIEVAL_LIMIT
+            similar_chunks = await self.vector_store.search_similar_chunks(
+                question_vector,
+                limit=limit,
+                query_text=question,
+                course_id=self.course_id,
+                file_id=self.file_id
+            )
             # self.logger.info(f"Similar chunks: {similar_chunks}")
             return similar_chunks
         except Exception as e:
             self.logger.error(f"Error getting similar chunks: {e}")
             raise e
         
-    async def get_courses(self):
+    async def rerank_chunks(self, question: str, similar_chunks: List[dict]):
+        if not self.reranker or not similar_chunks:
+            return similar_chunks
         try:
-            data_dir = "data"
-            courses = []
-            for filename in os.listdir(data_dir):
-                course_name = filename.split(".")[0]
-                courses.append(course_name)
-            return courses
+            return await self.reranker.rerank(question, similar_chunks)
         except Exception as e:
-            self.logger.error(f"Error getting courses name: {e}")
-            return [
-                "Water Matters Understanding Conservation: ",
-                "The Use of AI in Sustainability: ",
-                "Introduction To Sustainability Concepts: ",
-                "Introduction to Climate Change: ",
-                "Introduction to Biodiversity Conservation.docx",
-                "GHG Accounting Course Full Course.docx",
-                "Exploring Carbon Credits.docx",
-                "ESG Reporting Standards Specialist Track Full Course.docx"
-            ]
-    
-    async def get_instructions(self):
-        return """
-### You are an AI-Powered Educational Assistant for Fusion Ed by FusionMinds.ai
-
-Your purpose is to help users explore and understand the educational content and offerings available on the Fusion Ed platform. You act as a friendly and knowledgeable guide to:
-- Focus solely on the specific question without referencing documents or context
-- Answer questions about available courses and talks
-- Recommend suitable learning paths based only on Fusion Ed's provided content
-- Maintain clarity, brevity, and professionalism in every response
-- Handle unrelated queries politely and redirect appropriately
-
----
-
-### Guidelines for Responses
-
-#### General Instructions
-1. **Begin responses naturally and conversationally. Avoid phrases like "According to the documents", "Based on the documents", or "As mentioned earlier."**
-2. Focus strictly on Fusion Ed offerings when answering or recommending courses.
-3. Use warm, supportive language while remaining informative and respectful.
-4. If the user's intent or context is unclear, politely ask clarifying questions.
-5. Only recommend courses that appear in the available course list (`##Fusion Ed Available Courses`).
-6. Match recommendations to the user's interest or level, but **never hallucinate new content**.
-
-#### Course Recommendation Guidelines
-1. When recommending courses:
-   - Check the chat history for previously recommended courses
-   - Avoid repeating the same course recommendations unless specifically requested
-   - If a course was already recommended, acknowledge it and suggest complementary courses
-   - Consider the user's learning progression and suggest next steps
-   - Group related courses together for a cohesive learning path
-
-2. For follow-up recommendations:
-   - Reference previously recommended courses when relevant
-   - Build upon previous recommendations to create a learning journey
-   - Suggest courses that complement previously recommended ones
-   - Consider the user's demonstrated interests from the conversation
-
-3. When discussing courses:
-   - Highlight how new recommendations relate to previously mentioned courses
-   - Explain the logical progression between courses
-   - Emphasize the value of the complete learning path
-   - Maintain context of the user's learning goals
-"""  
+            # Retrieval order is still usable; keep the answer flowing
+            self.logger.error(f"Error reranking chunks: {e}")
+            return similar_chunks[:self.reranker.top_n]
+
+    async def get_courses(self):
+        if not self.course_catalog:
+            return []
+        return self.course_catalog.get_courses()
 
 
     async def construct_prompt(self, query:str, chunks:dict, history:list, courses:list):
 
-        instructions = await self.get_instructions()
-        similar_chunks = await self.format_similar_chunks(chunks)
-        self.logger.info(f"Similar chunks: {similar_chunks}")
-        chat_history = await self.format_chat_history(history) if history else ""
-        fusion_courses = await self.format_courses(courses)
-        links = await self.format_links()
+        catalog_version = await self.get_catalog_version(courses)
+        static_messages = self.prompt_template.get_static_messages(courses, catalog_version)
 
-        user_prompt = query     
-        system_prompts = [instructions, fusion_courses, links, similar_chunks, chat_history]
+        packer = ContextPacker(getattr(self.llm, "context_budget", None) or self.settings.LLM_CONTEXT_BUDGET)
+        fixed_segments = [message["content"] for message in static_messages] + \
+            [self.CONTEXT_HEADERS, self.prompt_template.ANSWER_INSTRUCTION, query]
+        packed = packer.pack(fixed_segments, chunks, history or [])
 
-        llm_entry = []
-        
-        if system_prompts:
-            for prompt in system_prompts:
-                llm_entry.append({
-                    "role": "system",
-                    "content": prompt
-                })
-
-        if user_prompt:
-
-            llm_entry.append({
-                "role": "user",
-                "content": "answer based ONLY on documents provided"
-            })
-            
-            llm_entry.append({
-                "role": "user",
-                "content": user_prompt
-            })
-
-        return llm_entry
+        similar_chunks = await self.format_similar_chunks(packed["chunks"])
+        self.logger.info(f"Similar chunks: {similar_chunks}")
+        chat_history = await self.format_chat_history(packed["chat_history"]) if packed["chat_history"] else ""
+
+        return self.prompt_template.render(courses, catalog_version, [similar_chunks, chat_history], query)
     
     
     async def format_similar_chunks(self, chunks: List[dict]):
@@ -215,10 +304,3 @@ Your purpose is to help users explore and understand the educational content and
             formatted_history.append(formatted_entry)
 
         return "##Chat History:\n" + "\n".join(formatted_history)
-    
-    async def format_courses(self, courses: list):
-        return "##Fusion Ed Available Courses:\n" + "\n".join(courses)
-    
-    async def format_links(self):
-        return "##Links\n" + "Fusion Ed: https://www.fusionminds.ai/fusion-ed\n" + \
-            "Fusion Academy Course Trailers: https://www.fusionminds.ai/fusion-ed/fusion-academy-course-trailers\n"
@@ -1,161 +1,173 @@
-import os
 import re
 import sys
+import asyncio
 from urllib.parse import urlparse
-from docx import Document
 from fastapi import HTTPException, status
-from pptx import Presentation
-from langchain_community.document_loaders import PyMuPDFLoader
-import requests
+import httpx
 from src.controllers.BaseController import BaseController
+from src.modules.ingestion.fetching import FetchError, FileFetcher
+from src.modules.ingestion.parsing import PARSERS, ParseTimeoutError
 
 
 
 class DataExtractionController(BaseController): 
-    def __init__(self, file_urls):
+    def __init__(self, file_urls, parser_engine=None):
         super().__init__()
         self.file_urls = file_urls
-        self.file_extensions = [file_url.split('.')[-1] for file_url in file_urls]
+        self.parser_engine = parser_engine
+        self.file_extensions = [urlparse(file_url).path.split('.')[-1].lower() for file_url in file_urls]
         self.file_contents = []
+        self.supported_extensions = {"pdf", "docx", "doc", "pptx", "ppt", "md", "txt", "json"}
 
 
     async def load(self):
 
-        for index, (file_url, extension) in enumerate(zip(self.file_urls, self.file_extensions)):
+        results = [result async for result in self.iter_load()]
+        self.file_contents = sorted(results, key=lambda content: content["index"])
+        return self.file_contents
+
+
+    async def iter_load(self):
+        # Yields each file's result as soon as it is ready, with at most
+        # INGESTION_CONCURRENCY files being fetched or parsed at a time
+        concurrency = self.settings.INGESTION_CONCURRENCY
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(timeout=self.settings.INGESTION_HTTP_TIMEOUT, follow_redirects=True) as http_client:
+            self.fetcher = FileFetcher(http_client)
+            in_flight = set()
+            try:
+                for index, (file_url, extension) in enumerate(zip(self.file_urls, self.file_extensions)):
+                    in_flight.add(asyncio.create_task(self.load_file(index, file_url, extension, semaphore)))
+                    if len(in_flight) >= concurrency:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+
+                while in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in in_flight:
+                    task.cancel()
+
+
+    async def load_file(self, index, file_url, extension, semaphore):
+
+        async with semaphore:
 
             if not (await self.is_valid_url(file_url)):
-                self.message = "has invalid URL"
-                self.file_contents.append(
-                    {
-                        "success": False,
-                        "message": self.message,
-                        "content": None,
-                        "index": index
-                    }
-                )
                 self.logger.info(f"File {file_url} has invalid URL")
-                continue
+                return await self.file_result(index, False, "has invalid URL")
+
+            if extension not in self.supported_extensions:
+                return await self.file_result(index, False, "has unsupported extension")
+
+            try:
+                # Download once, every loader reads from the same buffer
+                fetched_file = await self.fetcher.fetch(file_url)
+            except FetchError as e:
+                self.logger.info(f"File {file_url} {e.message}")
+                return await self.file_result(index, False, e.message)
 
-            content = await self.get_file_content(file_url, extension)
+            try:
+                content = await self.get_file_content(fetched_file, extension)
+            except ParseTimeoutError as e:
+                self.logger.error(f"File {file_url} timed out: {e}")
+                return await self.file_result(index, False, "timed out while processing")
+            except HTTPException as e:
+                self.logger.error(f"File {file_url} failed to process: {e.detail}")
+                return await self.file_result(index, False, "failed to process")
+            finally:
+                fetched_file.close()
 
             if content and content.strip() == '':
-                self.message = "is empty"
-                self.file_contents.append(
-                    {
-                        "success": False,
-                        "message": self.message,
-                        "content": None,
-                        "index": index
-                    }
-                )
                 self.logger.info(f"File {file_url} is empty")
-                continue
+                return await self.file_result(index, False, "is empty")
 
             elif content:
                 processed_data = await self.process(content)
-                self.message = "is successfully uploaded"
-                self.file_contents.append(
-                    {
-                        "success": True,
-                        "message": self.message,
-                        "content": processed_data,
-                        "index": index
-                    }
-                )
-                continue
+                return await self.file_result(index, True, "is successfully uploaded", processed_data)
 
             else:
-                self.message = "has unsupported extension"
-                self.file_contents.append(
-                    {
-                        "success": False,
-                        "message": self.message,
-                        "content": None,
-                        "index": index
-                    }
-                )
+                return await self.file_result(index, False, "has unsupported extension")
 
-        return self.file_contents
+
+    async def file_result(self, index, success, message, content=None):
+        return {
+            "success": success,
+            "message": message,
+            "content": content,
+            "index": index
+        }
 
 
 
     async def is_valid_url(self, file_url):
-        if urlparse(file_url).scheme in ("http", "https"):
-            try:
-                response = requests.get(file_url)
-                return response.status_code == 200
-            except requests.exceptions.RequestException:
-                return False
-        else:
-            return os.path.isfile(file_url)
+        return await self.fetcher.validate(file_url)
 
 
 
-    async def get_file_content(self, file_url, extension):
+    async def get_file_content(self, fetched_file, extension):
         self.logger.info(f"Extension: {extension}")
         if extension == "pdf":
-            return await self.load_pdf(file_url)
+            return await self.load_pdf(fetched_file)
         
         elif extension in {"docx", "doc"}: 
-            return await self.load_docx(file_url)
+            return await self.load_docx(fetched_file)
         
         elif extension in {"pptx", "ppt"}:
-            return await self.load_pptx(file_url)
+            return await self.load_pptx(fetched_file)
         
         elif extension in {"md", "txt", "json"}:
-            return await self.load_txt(file_url)
+            return await self.load_txt(fetched_file)
         
         else:
             return None
 
 
-    async def load_docx(self, file_url):
-        try:
+    async def run_parser(self, file_format, fetched_file):
+        # Text files are cheap to decode, only binary formats go to the parser processes
+        if self.parser_engine and file_format != "txt":
+            return await self.parser_engine.parse(file_format, fetched_file)
 
-            text = ""
-            document = Document(file_url)
-            text = "\n".join([p.text for p in document.paragraphs])
-            
-            return text
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, PARSERS[file_format], fetched_file)
+
+
+    async def load_docx(self, fetched_file):
+        try:
+            return await self.run_parser("docx", fetched_file)
+        except ParseTimeoutError:
+            raise
         except Exception:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error in processing Word File")
     
     
-    async def load_txt(self, file_url):
+    async def load_txt(self, fetched_file):
         try:
-            with open(file_url, "r", encoding="utf-8") as f:
-                return f.read()
+            return await self.run_parser("txt", fetched_file)
         except Exception:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error in processing txt File")
     
 
 
-    async def load_pptx(self, file_url):
+    async def load_pptx(self, fetched_file):
         try:
-            text = ""
-
-            presentation = Presentation(file_url)
-                
-            for slide in presentation.slides:
-                for shape in slide.shapes:
-                    if shape.has_text_frame:
-                        for paragraph in shape.text_frame.paragraphs:
-                            text += paragraph.text + "\n"
-
-            return text
+            return await self.run_parser("pptx", fetched_file)
+        except ParseTimeoutError:
+            raise
         except Exception:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error in processing powerpoint File")
         
     
 
-    async def load_pdf(self, file_url):
+    async def load_pdf(self, fetched_file):
         try:
-            loader = PyMuPDFLoader(file_url)
-            row_data = ""
-            for doc in loader.load():
-                row_data += doc.page_content + "\n"
-            return row_data
+            return await self.run_parser("pdf", fetched_file)
         
+        except ParseTimeoutError:
+            raise
         except Exception as e:
             self.logger.error(f"Error processing PDF file: {str(e)}")
             raise HTTPException(
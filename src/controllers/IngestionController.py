@@ -0,0 +1,138 @@
+import asyncio
+from src.controllers.BaseController import BaseController
+from src.controllers.DataExtractionController import DataExtractionController
+from src.controllers.RagController import RagController
+from src.modules.ingestion.pipeline import bounded_stage
+
+
+class IngestionController(BaseController):
+    """Streams uploaded files through extract -> split -> embed -> upsert.
+
+    Stages are async generators joined by bounded queues, so peak memory is
+    set by the INGESTION_*_QUEUE_SIZE settings rather than by the upload size,
+    and a slow vector store throttles extraction.
+    """
+    def __init__(self, vector_store, parser_engine=None, answer_cache=None, course_catalog=None, on_file_done=None):
+        super().__init__()
+        self.vector_store = vector_store
+        self.parser_engine = parser_engine
+        self.rag_controller = RagController(vector_store, answer_cache=answer_cache)
+        self.course_catalog = course_catalog
+        # Awaited with a file's result once all of its chunks are written
+        self.on_file_done = on_file_done
+
+
+    async def ingest(self, files):
+        self.files = files
+        self.results = {}
+
+        documents = bounded_stage(self.extract(), self.settings.INGESTION_DOCUMENT_QUEUE_SIZE)
+        chunks = bounded_stage(self.split(documents), self.settings.INGESTION_CHUNK_QUEUE_SIZE)
+        batches = bounded_stage(self.embed(chunks), self.settings.INGESTION_UPSERT_QUEUE_SIZE)
+
+        in_flight = set()
+        try:
+            async for batch in batches:
+                in_flight.add(asyncio.create_task(self.upsert(batch)))
+                if len(in_flight) >= self.settings.UPSERT_CONCURRENCY:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+            await asyncio.gather(*in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        return [self.results[index] for index in sorted(self.results)]
+
+
+    async def extract(self):
+        file_urls = [file.file_url for file in self.files]
+        data_extraction_controller = DataExtractionController(file_urls, parser_engine=self.parser_engine)
+
+        async for content in data_extraction_controller.iter_load():
+            index = content["index"]
+            self.results[index] = {
+                "index": index,
+                "success": content["success"],
+                "message": content.get("message", "Failed to process file"),
+                "chunks": 0,
+                "unchanged_chunks": 0,
+                "failed_chunks": 0,
+                "pending_chunks": 0,
+                "split_done": False
+            }
+            if content["success"]:
+                yield index, content["content"]
+            else:
+                await self.finish_file(index)
+
+
+    async def split(self, documents):
+        async for index, content in documents:
+            file = self.files[index]
+            metadata = {
+                "file_id": file.file_id,
+                "file_url": file.file_url,
+                "file_name": file.file_name,
+                "course_id": file.course_id
+            }
+            result = self.results[index]
+            async for chunk, changed in self.rag_controller.split_document(content, metadata):
+                result["chunks"] += 1
+                if not changed:
+                    result["unchanged_chunks"] += 1
+                    continue
+                result["pending_chunks"] += 1
+                yield index, chunk
+
+            result["split_done"] = True
+            if not result["pending_chunks"]:
+                await self.finish_file(index)
+
+
+    async def embed(self, chunks):
+        batch_size = self.settings.INGESTION_EMBED_BATCH_SIZE
+        batch = []
+        async for item in chunks:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield await self.embed_batch(batch)
+                batch = []
+
+        if batch:
+            yield await self.embed_batch(batch)
+
+
+    async def embed_batch(self, batch):
+        documents_with_embeddings = await self.rag_controller.embed_chunks([chunk for _, chunk in batch])
+        # The file index travels next to the chunk, it is not part of the stored payload
+        for document, (index, _) in zip(documents_with_embeddings, batch):
+            document["index"] = index
+        return documents_with_embeddings
+
+
+    async def upsert(self, batch):
+        report = await self.rag_controller.save_embeddings_to_vectordb(batch)
+        failed = {(chunk["file_id"], chunk["chunk_order"]) for chunk in report["failed"]}
+
+        for document in batch:
+            result = self.results[document["index"]]
+            if (document["metadata"]["file_id"], document["metadata"]["chunk_order"]) in failed:
+                result["failed_chunks"] += 1
+            result["pending_chunks"] -= 1
+            if result["split_done"] and not result["pending_chunks"]:
+                await self.finish_file(document["index"])
+
+
+    async def finish_file(self, index):
+        result = self.results[index]
+        if result["failed_chunks"]:
+            result["success"] = False
+            result["message"] = f"failed to index {result['failed_chunks']} of {result['chunks']} chunks"
+
+        if result["success"] and self.course_catalog:
+            await self.course_catalog.add(self.files[index].file_name)
+
+        if self.on_file_done:
+            await self.on_file_done(result)
@@ -0,0 +1,143 @@
+import asyncio
+from src.controllers.BaseController import BaseController
+from src.controllers.IngestionController import IngestionController
+from src.models.enums.IngestionJobEnum import IngestionJobStatusEnum, IngestionFileStatusEnum
+from src.models.schemas.IngestionJobSchema import FileProgress
+
+
+class IngestionJobController(BaseController):
+    """Runs upload jobs on a bounded pool of background workers.
+
+    Jobs and per-file progress live in Mongo. A worker claims a job with a
+    lease that it keeps renewing; jobs whose lease expired (worker crashed)
+    or that were released on shutdown are picked up again and resume from
+    the files that are still pending.
+    """
+    def __init__(self, job_model, vector_store, parser_engine=None, answer_cache=None, course_catalog=None):
+        super().__init__()
+        self.job_model = job_model
+        self.vector_store = vector_store
+        self.parser_engine = parser_engine
+        self.answer_cache = answer_cache
+        self.course_catalog = course_catalog
+        self.lease_seconds = self.settings.INGESTION_JOB_LEASE_SECONDS
+
+        self.queue = asyncio.Queue()
+        self.queued_jobs = set()
+        self.running_jobs = set()
+        self.tasks = []
+
+
+    async def start(self):
+        for job_id in await self.job_model.get_resumable_job_ids():
+            await self.enqueue(job_id)
+
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.settings.INGESTION_WORKERS)]
+        self.tasks.append(asyncio.create_task(self.recover()))
+        self.logger.info(f"Started {self.settings.INGESTION_WORKERS} ingestion workers")
+
+
+    async def stop(self):
+        # Snapshot before cancelling: run_job drops its job from the set on the way out
+        interrupted_jobs = list(self.running_jobs)
+
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+        # Hand unfinished jobs back so the next start resumes them right away
+        for job_id in interrupted_jobs:
+            try:
+                await self.job_model.release_job(job_id)
+            except Exception as e:
+                self.logger.error(f"Error releasing ingestion job {job_id}: {e}")
+
+
+    async def submit(self, files) -> str:
+        job_id = await self.job_model.create_job([file.model_dump() for file in files])
+        await self.enqueue(job_id)
+        return job_id
+
+
+    async def get_job(self, job_id: str):
+        return await self.job_model.get_job(job_id)
+
+
+    async def enqueue(self, job_id: str):
+        if job_id in self.queued_jobs or job_id in self.running_jobs:
+            return
+        self.queued_jobs.add(job_id)
+        self.queue.put_nowait(job_id)
+
+
+    async def worker(self):
+        while True:
+            job_id = await self.queue.get()
+            self.queued_jobs.discard(job_id)
+            try:
+                await self.run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error running ingestion job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+
+    async def run_job(self, job_id: str):
+        job = await self.job_model.claim_job(job_id, self.lease_seconds)
+        if job is None:
+            # Finished already or held by a live worker
+            return
+
+        self.running_jobs.add(job_id)
+        heartbeat = asyncio.create_task(self.heartbeat(job_id))
+        try:
+            pending = [
+                (index, FileProgress(**file))
+                for index, file in enumerate(job["files"])
+                if file["status"] == IngestionFileStatusEnum.PENDING.value
+            ]
+            self.logger.info(f"Running ingestion job {job_id} with {len(pending)} pending files")
+
+            async def on_file_done(result):
+                await self.job_model.update_file(job_id, pending[result["index"]][0], result)
+
+            ingestion_controller = IngestionController(
+                self.vector_store,
+                parser_engine=self.parser_engine,
+                answer_cache=self.answer_cache,
+                course_catalog=self.course_catalog,
+                on_file_done=on_file_done
+            )
+            await ingestion_controller.ingest([file for _, file in pending])
+            await self.job_model.finish_job(job_id, IngestionJobStatusEnum.COMPLETED.value)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Ingestion job {job_id} failed: {e}")
+            await self.job_model.finish_job(job_id, IngestionJobStatusEnum.FAILED.value, error=str(e))
+        finally:
+            heartbeat.cancel()
+            self.running_jobs.discard(job_id)
+
+
+    async def heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.job_model.renew_lease(job_id, self.lease_seconds)
+            except Exception as e:
+                self.logger.error(f"Error renewing lease of ingestion job {job_id}: {e}")
+
+
+    async def recover(self):
+        # Picks up jobs abandoned by workers in other processes
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                for job_id in await self.job_model.get_resumable_job_ids():
+                    await self.enqueue(job_id)
+            except Exception as e:
+                self.logger.error(f"Error recovering ingestion jobs: {e}")
@@ -1,23 +1,98 @@
+import hashlib
+import re
+import numpy as np
 from src.controllers.BaseController import BaseController
+from src.helpers.metrics import get_counters
+from src.modules.rag.embedding import Embedding
+
+# Back-references to an earlier turn: personal pronouns, demonstratives used
+# as pronouns, phrases like "the above" and follow-up openers. Words such as
+# "there", "other" or "more" also appear in self-contained questions, so they
+# only count in the phrases that actually refer back.
+ANAPHORA_PATTERN = re.compile(
+    r"\b(it|its|it's|itself|they|them|their|theirs|themselves|he|she|him|her|his|hers)\b"
+    r"|\b(this|these|those)\b(?!\s+(year|week|month|semester|term)\b)"
+    r"|^\s*that\b|\bthat\s*[?.!]*\s*$"
+    r"|\b(the|this|that|which|same|other|previous|last|first|second)\s+ones?\b"
+    r"|\bthe\s+(above|former|latter|same|previous|earlier|last\s+(one|answer|question))\b"
+    r"|\b(you|we)\s+(said|mentioned|just|talked|discussed)\b|\b(mentioned|said)\s+(above|before|earlier)\b"
+    r"|\b(what|who|where|anything|something)\s+else\b|\b(tell|show|give)\s+me\s+more\b|\bagain\b"
+    r"|^\s*(and|but|so|then|also|more|what about|how about|why not|ok|okay)\b",
+    re.IGNORECASE
+)
+
 
 class QueryTranslationController(BaseController):
-    def __init__(self, llm):
+    def __init__(self, llm, embedding_model=None, translation_cache=None):
         super().__init__()
         self.llm = llm
+        self.embedding_model = embedding_model
+        self.translation_cache = translation_cache
+        self.metrics = get_counters("query_translation")
 
     async def translate_query(self, question: str, chat_history: list) -> str:
         if not chat_history:
             return question
 
+        if await self.is_self_contained(question, chat_history):
+            self.metrics.incr("skipped")
+            return question
+        self.metrics.incr("translated")
+
         formatted_history = await self.format_chat_history(chat_history)
+        if not self.translation_cache:
+            translated_question = await self.generate_translation(question, formatted_history)
+        else:
+            # Keyed on the turns the prompt actually uses, so older history does not split entries
+            history_fingerprint = hashlib.sha256(formatted_history.encode("utf-8")).hexdigest()
+            key = self.translation_cache.make_key(question, history_fingerprint, getattr(self.llm, "model_id", None))
+            translated_question = await self.translation_cache.get_or_translate(
+                key, lambda: self.generate_translation(question, formatted_history)
+            )
+
+        return translated_question or question
+
+    async def generate_translation(self, question: str, formatted_history: str):
         instructions = await self.get_instructions()
         llm_entry = await self.construct_prompt(question, [instructions, formatted_history])
 
         response = await self.llm.generate_response(llm_entry)
-
+        if not response:
+            return None
         return response.strip()
 
 
+    async def is_self_contained(self, question: str, chat_history: list) -> bool:
+        """Cheap local check for questions the LLM would return unchanged."""
+        if not self.settings.QUERY_TRANSLATION_GATE_ENABLED:
+            return False
+        if ANAPHORA_PATTERN.search(question):
+            return False
+        if len(question.split()) >= self.settings.QUERY_TRANSLATION_GATE_MIN_WORDS:
+            return True
+
+        # Short questions are often elliptical follow-ups; only a clear topic change is safe to skip
+        if not self.settings.QUERY_TRANSLATION_GATE_EMBEDDING:
+            return False
+        similarity = await self.get_similarity(question, chat_history[0].get("question", ""))
+        return similarity < self.settings.QUERY_TRANSLATION_GATE_SIMILARITY
+
+    async def get_similarity(self, question: str, last_question: str) -> float:
+        if not last_question:
+            return 0.0
+        if self.embedding_model is None:
+            self.embedding_model = Embedding()
+
+        # Query embeddings, so the search that follows a skip reuses the cached vector
+        vectors = np.asarray([
+            await self.embedding_model.embed_query(question),
+            await self.embedding_model.embed_query(last_question)
+        ], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1)
+        if not norms.all():
+            return 0.0
+        return float(vectors[0] @ vectors[1] / (norms[0] * norms[1]))
+
     async def get_instructions(self):
         return """You are a Query Translation Expert. Your task is to transform follow-up questions into complete, self-contained questions by incorporating relevant context from the chat history.
 
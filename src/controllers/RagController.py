@@ -2,59 +2,61 @@ from fastapi import HTTPException, status
 from src.controllers.BaseController import BaseController
 from src.modules.rag.embedding import Embedding
 from src.modules.rag.splitting import RecursiveSplitter
+from src.modules.rag.upserting import UpsertEngine
 
 
 class RagController(BaseController):
-    def __init__(self, vector_store):
+    def __init__(self, vector_store, answer_cache=None):
         super().__init__()
         self.vector_store = vector_store
+        self.answer_cache = answer_cache
         self.text_splitter = RecursiveSplitter()
         self.embedding_model = Embedding()
-
-    async def text_splits_embeddings(self, contents, metadata):
-        # Split documents into chunks
-        split_documents = await self.text_splitter.split_documents(contents, metadata)
-        
-        # Add chunk order to metadata
-        updated_split_documents = []
-        for doc_index, (original_doc, original_metadata) in enumerate(zip(contents, metadata)):
-                chunked_docs = [
-                    (chunk_index, doc) for chunk_index, doc in enumerate(split_documents) 
-                    if doc.metadata['file_id'] == original_metadata['file_id']
-                ]
-                for chunk_index, chunked_doc in chunked_docs:
-                    chunked_doc.metadata['chunk_order'] = chunk_index + 1  
-                    updated_split_documents.append(chunked_doc)
-            
-            # Extract updated page contents and metadata
-        page_contents = [doc.page_content for doc in updated_split_documents]
-        metadatas = [doc.metadata for doc in updated_split_documents]
-            
-
+        self.upsert_engine = UpsertEngine(vector_store)
+
+    async def split_document(self, content, metadata):
+        # Yields (chunk, changed); unchanged chunks are already indexed with the same content
+        file_id = metadata["file_id"]
+        indexed_hashes = await self.vector_store.get_file_chunk_hashes(file_id)
+
+        keep_ids = []
+        async for _, chunk_order, chunk in self.text_splitter.iter_splits([content], [metadata]):
+            point_id = self.vector_store.make_point_id(file_id, chunk_order)
+            content_hash = self.vector_store.make_content_hash(chunk.page_content)
+            chunk.metadata["content_hash"] = content_hash
+            keep_ids.append(point_id)
+            yield chunk, indexed_hashes.get(point_id) != content_hash
+
+        # Chunks past the new end of the file, or left over from random ids
+        if set(indexed_hashes) - set(keep_ids):
+            await self.vector_store.delete_stale_chunks(file_id, keep_ids)
+            # Cached answers may cite the deleted chunks
+            if self.answer_cache:
+                await self.answer_cache.invalidate()
+
+
+    async def embed_chunks(self, chunks):
+        page_contents = [doc.page_content for doc in chunks]
         embeddings = await self.embedding_model.embed_documents(page_contents)
-
-        # Prepare documents for insertion
-        documents_with_embeddings = [
-            {"text": text, "embedding": embedding, "metadata": metadata}
-            for text, embedding, metadata in zip(page_contents, embeddings, metadatas or [{}]*len(page_contents))
+        return [
+            {"text": doc.page_content, "embedding": embedding, "metadata": doc.metadata}
+            for doc, embedding in zip(chunks, embeddings)
         ]
-        return documents_with_embeddings
-    
+
 
     async def save_embeddings_to_vectordb(self, documents_with_embeddings):
             
         try:
-            batch_size = 5
-
-            for i in range(0, len(documents_with_embeddings), batch_size):
-                batch = documents_with_embeddings[i:i + batch_size]
-                try:
-                    await self.vector_store.save_chunks(batch)
-                    self.logger.info(f"Successfully added batch {i // batch_size + 1}")
-                except Exception as e:
-                    self.logger.error(f"Failed to add batch {i // batch_size + 1} to vector store: {str(e)}")
-            # Add documents to the vector database            
-            self.logger.info("Documents successfully added to the vector database.")
+            report = await self.upsert_engine.upsert(documents_with_embeddings)
+            if report["failed"]:
+                self.logger.error(f"Failed to add {len(report['failed'])} chunks to the vector database")
+            self.logger.info(f"{report['upserted']} chunks successfully added to the vector database.")
+
+            # Cached answers may no longer reflect the indexed content
+            if report["upserted"] and self.answer_cache:
+                await self.answer_cache.invalidate()
+
+            return report
 
         except Exception as e:
             self.logger.error(f"Error saving embeddings to vector database: {e}")
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict
 import os
 from dotenv import load_dotenv
 
@@ -12,15 +13,76 @@ class Settings(BaseSettings):
     MONGODB_DATABASE: str
     MONGODB_COLLECTION: str    
 
+    EMBEDDING_BACKEND: str = "GOOGLE"
     EMBEDDING_MODEL: str
-    EMBEDDING_API_KEY: str
+    EMBEDDING_API_KEY: str = ""
     EMBEDDING_SIZE: int
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_NUM_WORKERS: int = 1
+    EMBEDDING_NUM_THREADS: int = 4
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DIR: str = "assets/embedding_cache"
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = 10000
 
     QDRANT_COLLECTION_NAME: str
     QDRANT_URL: str
     QDRANT_API_KEY: str
     CHUNK_SIZE: int
     CHUNK_OVERLAP: int
+    CHUNK_SIZE_UNIT: str = "characters"
+    CHUNK_TOKEN_ENCODING: str = "cl100k_base"
+
+    INGESTION_CONCURRENCY: int = 4
+    INGESTION_HTTP_TIMEOUT: float = 60.0
+    INGESTION_DOCUMENT_QUEUE_SIZE: int = 2
+    INGESTION_CHUNK_QUEUE_SIZE: int = 256
+    INGESTION_EMBED_BATCH_SIZE: int = 64
+    INGESTION_UPSERT_QUEUE_SIZE: int = 2
+    INGESTION_WORKERS: int = 2
+    INGESTION_JOB_LEASE_SECONDS: int = 300
+
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_PREFETCH_LIMIT: int = 30
+    SPARSE_BM25_K1: float = 1.2
+    SPARSE_BM25_B: float = 0.75
+    SPARSE_AVG_DOC_LENGTH: float = 150
+
+    RETRIEVAL_LIMIT: int = 10
+    RERANKER_ENABLED: bool = False
+    RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANKER_CANDIDATES: int = 30
+    RERANKER_TOP_N: int = 5
+    RERANKER_BATCH_SIZE: int = 16
+    RERANKER_MAX_LENGTH: int = 512
+    RERANKER_NUM_WORKERS: int = 1
+    RERANKER_NUM_THREADS: int = 4
+    RERANKER_CACHE_ENTRIES: int = 50000
+    RERANKER_CACHE_TTL_SECONDS: float = 3600
+
+    QDRANT_HNSW_M: int = 16
+    QDRANT_HNSW_EF_CONSTRUCT: int = 100
+    QDRANT_HNSW_ON_DISK: bool = False
+    # Defaults keep Qdrant's own behaviour: no quantization, vectors in RAM
+    QDRANT_SEARCH_HNSW_EF: int = 0
+    QDRANT_QUANTIZATION: str = "none"
+    QDRANT_QUANTIZATION_ALWAYS_RAM: bool = True
+    QDRANT_QUANTIZATION_RESCORE: bool = True
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = 2.0
+    QDRANT_VECTORS_ON_DISK: bool = False
+    QDRANT_PAYLOAD_ON_DISK: bool = False
+
+    UPSERT_MAX_BATCH_BYTES: int = 2 * 1024 * 1024
+    UPSERT_MAX_BATCH_POINTS: int = 256
+    UPSERT_CONCURRENCY: int = 4
+    UPSERT_MAX_TRIES: int = 4
+    UPSERT_BACKOFF_SECONDS: float = 0.5
+    UPSERT_WAIT: bool = True
+    FETCH_MAX_FILE_SIZE: int = 100 * 1024 * 1024
+    FETCH_SPOOL_MEMORY_SIZE: int = 8 * 1024 * 1024
+    PARSER_NUM_WORKERS: int = 2
+    PARSER_MAX_TASKS_PER_WORKER: int = 50
+    PARSER_TIMEOUT_SECONDS: float = 120.0
+    PARSER_FORMAT_CONCURRENCY: Dict[str, int] = {"pdf": 2, "docx": 2, "pptx": 1}
 
     LLM_PROVIDER: str
     LLM_API_KEY: str
@@ -28,12 +90,47 @@ class Settings(BaseSettings):
     LLM_MAX_TOKENS: int
     LLM_TEMPERATURE: float
     LLM_API_URL: str
+    LLM_CONTEXT_BUDGET: int = 6000
+    LLM_CONTEXT_BUDGETS: Dict[str, int] = {"gemma2-9b-it": 6000}
+    CONTEXT_TOKEN_ENCODING: str = "cl100k_base"
+    CONTEXT_MIN_TRIM_TOKENS: int = 64
     GROQ_API_KEY: str
     OPENROUTER_API_KEY: str
     AZURE_ENDPOINT: str
     AZURE_OPENAI_API_KEY: str
     AZURE_OPENAI_API_VERSION: str
 
+    CHAT_HISTORY_WRITE_BEHIND: bool = True
+    CHAT_HISTORY_FLUSH_SIZE: int = 50
+    CHAT_HISTORY_FLUSH_INTERVAL: float = 1.0
+    CHAT_HISTORY_JOURNAL_PATH: str = "assets/chat_history_journal.jsonl"
+    CHAT_HISTORY_CACHE_ENABLED: bool = True
+    CHAT_HISTORY_CACHE_USERS: int = 10000
+    CHAT_HISTORY_CACHE_TURNS: int = 20
+    CHAT_HISTORY_CACHE_TTL_SECONDS: float = 30
+    CHAT_HISTORY_CACHE_WATCH: bool = False
+
+    COURSE_CATALOG_REFRESH_SECONDS: float = 300
+    COURSE_CATALOG_MAX_FILES: int = 10000
+
+    QUERY_TRANSLATION_GATE_ENABLED: bool = True
+    QUERY_TRANSLATION_GATE_MIN_WORDS: int = 4
+    QUERY_TRANSLATION_GATE_EMBEDDING: bool = False
+    QUERY_TRANSLATION_GATE_SIMILARITY: float = 0.5
+
+    TRANSLATION_CACHE_ENABLED: bool = True
+    TRANSLATION_CACHE_MAX_ENTRIES: int = 10000
+    TRANSLATION_CACHE_TTL_SECONDS: float = 3600
+    TRANSLATION_CACHE_SHARED: bool = False
+
+    CHAT_PIPELINED_RETRIEVAL: bool = True
+    SPECULATIVE_SEARCH_SIMILARITY: float = 0.9
+
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+
     # class Config:
     #     env_file = ".env"
 
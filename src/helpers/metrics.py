@@ -0,0 +1,31 @@
+from collections import defaultdict
+from typing import Dict
+
+
+class Counters:
+    def __init__(self, name: str):
+        self.name = name
+        self.values = defaultdict(float)
+
+    def incr(self, key: str, amount: float = 1) -> None:
+        self.values[key] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        snapshot = dict(self.values)
+        lookups = snapshot.get("hits", 0) + snapshot.get("misses", 0)
+        if lookups:
+            snapshot["hit_rate"] = snapshot.get("hits", 0) / lookups
+        return snapshot
+
+
+_registry: Dict[str, Counters] = {}
+
+
+def get_counters(name: str) -> Counters:
+    if name not in _registry:
+        _registry[name] = Counters(name)
+    return _registry[name]
+
+
+def snapshot_all() -> Dict[str, Dict[str, float]]:
+    return {name: counters.snapshot() for name, counters in _registry.items()}
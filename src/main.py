@@ -1,7 +1,18 @@
 from fastapi import FastAPI
 from src.models.ChatHistoryModel import ChatHistoryModel
 from src.models.VectorStoreModel import VectorStoreModel
+from src.models.IngestionJobModel import IngestionJobModel
+from src.models.TranslationCacheModel import TranslationCacheModel
+from src.controllers.IngestionJobController import IngestionJobController
 from src.modules.llm.LLMProviderFactory import LLMProviderFactory
+from src.modules.cache.answer_cache import AnswerCache
+from src.modules.cache.translation_cache import TranslationCache
+from src.modules.rag.course_catalog import CourseCatalog
+from src.modules.llm.PromptTemplate import PromptTemplate
+from src.modules.llm.ContextPacker import get_encoding
+from src.modules.rag.local_embedding import LocalEmbeddings
+from src.modules.rag.reranking import Reranker
+from src.modules.ingestion.parsing import ParserEngine
 from src.routes.base import base_router
 from src.routes.file import file_router
 from src.routes.chat import chat_router
@@ -9,6 +20,7 @@ from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
 from qdrant_client import AsyncQdrantClient
 from src.helpers.config import get_settings
+import asyncio
 import logging
 import sys
 import os
@@ -29,6 +41,27 @@ async def lifespan(app: FastAPI):
     app.qdrant_client = AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
     app.vector_store = await VectorStoreModel.create_instance(app.qdrant_client)
     app.chat_history_model = await ChatHistoryModel.create_instance(app.mongo_client)
+    app.answer_cache = AnswerCache()
+    translation_store = None
+    if settings.TRANSLATION_CACHE_SHARED:
+        translation_store = await TranslationCacheModel.create_instance(app.mongo_client)
+    app.translation_cache = TranslationCache(shared_store=translation_store)
+    app.course_catalog = CourseCatalog(app.vector_store)
+    await app.course_catalog.start()
+    app.prompt_template = PromptTemplate()
+    # Loads (and on first run downloads) the token encoding before the first request needs it
+    await asyncio.to_thread(get_encoding, settings.CONTEXT_TOKEN_ENCODING)
+    app.reranker = Reranker() if settings.RERANKER_ENABLED else None
+    app.parser_engine = ParserEngine()
+    app.ingestion_job_model = await IngestionJobModel.create_instance(app.mongo_client)
+    app.ingestion_jobs = IngestionJobController(
+        app.ingestion_job_model,
+        app.vector_store,
+        parser_engine=app.parser_engine,
+        answer_cache=app.answer_cache,
+        course_catalog=app.course_catalog
+    )
+    await app.ingestion_jobs.start()
 
     llm_factory = LLMProviderFactory()
     # app.llm = await llm_factory.create(
@@ -48,8 +81,14 @@ async def lifespan(app: FastAPI):
         yield
     finally:
         logger.info("Shutting down Fusion-Ed")
-        await app.mongo_conn.close()
+        await app.ingestion_jobs.stop()
+        await app.course_catalog.stop()
+        await app.chat_history_model.close()
+        app.mongo_conn.close()
         await app.qdrant_client.close()
+        LocalEmbeddings.shutdown()
+        Reranker.shutdown()
+        await app.parser_engine.shutdown()
 
 
 
@@ -0,0 +1,110 @@
+"""Replace full chunk payloads stored in chat history with {id, score} references.
+
+Run once after deploying chunk references:
+
+    python -m src.migrations.compact_chat_history [--batch-size 500] [--dry-run]
+
+Point ids are looked up in Qdrant by each stored chunk's file_id and
+chunk_order, once per file. Chunks indexed before deterministic ids keep their
+original random ids, so the ids cannot be derived locally. A record is left
+unchanged when any of its chunks cannot be resolved: the point is gone, or
+file_id or chunk_order is missing. Those records are counted and logged. The
+migration only touches documents that still hold chunk text, so it can be
+re-run safely, for example after re-indexing.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from qdrant_client import AsyncQdrantClient
+from src.helpers.config import get_settings
+from src.models.VectorStoreModel import VectorStoreModel
+from src.models.enums.ChatHistoryEnum import ChatHistoryEnum
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEGACY_FILTER = {"metadata.similar_chunks": {"$elemMatch": {"text": {"$exists": True}}}}
+
+
+class ChunkResolver:
+    """Maps (file_id, chunk_order) to the point id actually stored in Qdrant."""
+    def __init__(self, vector_store: VectorStoreModel):
+        self.vector_store = vector_store
+        self.files: Dict[str, Dict[int, str]] = {}
+
+    async def resolve(self, metadata: dict) -> Optional[str]:
+        file_id, chunk_order = metadata.get("file_id"), metadata.get("chunk_order")
+        if file_id is None or chunk_order is None:
+            return None
+        if file_id not in self.files:
+            self.files[file_id] = await self.vector_store.get_file_chunk_ids(file_id)
+        return self.files[file_id].get(int(chunk_order))
+
+
+async def to_reference(chunk: dict, resolver: ChunkResolver):
+    if "text" not in chunk:
+        return chunk
+
+    point_id = await resolver.resolve(chunk.get("metadata") or {})
+    if point_id is None:
+        return None
+    return {"id": point_id, "score": chunk.get("score", 0.0)}
+
+
+async def compact(collection, resolver: ChunkResolver, batch_size: int, dry_run: bool):
+    cursor = collection.find(LEGACY_FILTER, {"metadata.similar_chunks": 1}).batch_size(batch_size)
+    updates = []
+    migrated = skipped = unresolved = 0
+
+    async for chat in cursor:
+        references = [await to_reference(chunk, resolver) for chunk in chat["metadata"]["similar_chunks"]]
+        missing = sum(reference is None for reference in references)
+        if missing:
+            # Keep the original chunks rather than store references to points that do not exist
+            skipped += 1
+            unresolved += missing
+            logger.warning(f"Kept chat history record {chat['_id']}: {missing} chunks could not be resolved")
+            continue
+        updates.append(UpdateOne({"_id": chat["_id"]}, {"$set": {"metadata.similar_chunks": references}}))
+
+        if len(updates) >= batch_size:
+            if not dry_run:
+                await collection.bulk_write(updates, ordered=False)
+            migrated += len(updates)
+            logger.info(f"Compacted {migrated} chat history records")
+            updates = []
+
+    if updates:
+        if not dry_run:
+            await collection.bulk_write(updates, ordered=False)
+        migrated += len(updates)
+
+    return migrated, skipped, unresolved
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    mongo_conn = AsyncIOMotorClient(settings.MONGODB_URL)
+    qdrant_client = AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+    collection = mongo_conn[settings.MONGODB_DATABASE][ChatHistoryEnum.CHAT_HISTORY_COLLECTION.value]
+    try:
+        resolver = ChunkResolver(VectorStoreModel(qdrant_client))
+        migrated, skipped, unresolved = await compact(collection, resolver, args.batch_size, args.dry_run)
+        action = "Would compact" if args.dry_run else "Compacted"
+        logger.info(f"{action} {migrated} chat history records, "
+                    f"kept {skipped} records with {unresolved} unresolvable chunks unchanged")
+    finally:
+        mongo_conn.close()
+        await qdrant_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
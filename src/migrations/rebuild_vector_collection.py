@@ -0,0 +1,165 @@
+"""Apply the QDRANT_* collection settings to the existing chunk collection.
+
+    python -m src.migrations.rebuild_vector_collection [--in-place] [--batch-size 256] [--keep-old]
+
+--in-place changes HNSW, quantization and on-disk settings with update_collection.
+Qdrant rebuilds the affected segments in the background and search keeps working.
+This cannot add the BM25 sparse vector used by hybrid search.
+
+Without --in-place, a new collection is created with the full configuration and
+every point is copied into it. Sparse vectors are recomputed from the stored text.
+The collection name then becomes an alias of the copy. On later rebuilds the alias
+is switched atomically and the previous copy is deleted unless --keep-old is given.
+On the first rebuild the original collection is deleted just before the alias is
+created, because an alias cannot share a name with a collection and Qdrant cannot
+swap the two in one operation. Searches fail for that moment. The original is only
+deleted once the copy holds every point, and alias creation is retried. If the
+alias still cannot be created, rerunning the script points the name at the newest
+copy instead of rebuilding. Pause ingestion while this runs: writes made to the old
+collection after their points were copied are lost.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import CollectionParamsDiff, CreateAlias, CreateAliasOperation, DeleteAlias
+from qdrant_client.http.models import DeleteAliasOperation, Disabled, PointStruct, SparseVector, VectorParamsDiff
+from src.helpers.config import get_settings
+from src.models.VectorStoreModel import VectorStoreModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def update_in_place(vector_store: VectorStoreModel):
+    settings = vector_store.settings
+    await vector_store.qdrant_client.update_collection(
+        collection_name=vector_store.collection_name,
+        vectors_config={"": VectorParamsDiff(on_disk=settings.QDRANT_VECTORS_ON_DISK)},
+        hnsw_config=vector_store.make_hnsw_config(),
+        quantization_config=vector_store.make_quantization_config() or Disabled.DISABLED,
+        collection_params=CollectionParamsDiff(on_disk_payload=settings.QDRANT_PAYLOAD_ON_DISK)
+    )
+    logger.info(f"Updated {vector_store.collection_name} in place, segments are re-optimized in the background")
+
+
+async def create_alias(client: AsyncQdrantClient, name: str, target: str, attempts: int = 5):
+    for attempt in range(1, attempts + 1):
+        try:
+            await client.update_collection_aliases(change_aliases_operations=[
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=name))
+            ])
+            return
+        except Exception as e:
+            if attempt == attempts:
+                logger.error(f"Could not create alias {name} -> {target}, every point is in {target}. "
+                             f"Rerun this script to restore {name}: {e}")
+                raise
+            logger.warning(f"Error creating alias {name} -> {target}, retrying: {e}")
+            await asyncio.sleep(attempt)
+
+
+async def find_orphaned_copy(vector_store: VectorStoreModel):
+    # A copy left behind when the original was deleted but the alias never created
+    prefix = f"{vector_store.collection_name}_"
+    collections = await vector_store.qdrant_client.get_collections()
+    copies = [c.name for c in collections.collections if c.name.startswith(prefix) and c.name[len(prefix):].isdigit()]
+    return max(copies, key=lambda c: int(c[len(prefix):]), default=None)
+
+
+async def resolve_source(vector_store: VectorStoreModel):
+    aliases = await vector_store.qdrant_client.get_aliases()
+    for alias in aliases.aliases:
+        if alias.alias_name == vector_store.collection_name:
+            return alias.collection_name, True
+    return vector_store.collection_name, False
+
+
+async def copy_points(vector_store: VectorStoreModel, source: str, target: str, batch_size: int) -> int:
+    hybrid = vector_store.settings.HYBRID_SEARCH_ENABLED
+    copied = 0
+    offset = None
+    while True:
+        points, offset = await vector_store.qdrant_client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        batch = []
+        for point in points:
+            dense = point.vector.get("") if isinstance(point.vector, dict) else point.vector
+            vector = dense
+            if hybrid:
+                sparse = vector_store.sparse_encoder.encode_document(point.payload.get("text", ""))
+                vector = {"": dense, vector_store.sparse_vector_name: SparseVector(**sparse)}
+            batch.append(PointStruct(id=point.id, vector=vector, payload=point.payload))
+
+        if batch:
+            await vector_store.qdrant_client.upsert(collection_name=target, points=batch, wait=True)
+            copied += len(batch)
+            logger.info(f"Copied {copied} points")
+        if offset is None:
+            return copied
+
+
+async def rebuild(vector_store: VectorStoreModel, batch_size: int, keep_old: bool):
+    client = vector_store.qdrant_client
+    name = vector_store.collection_name
+    if not await vector_store.collection_exists(name):
+        orphan = await find_orphaned_copy(vector_store)
+        if orphan is None:
+            raise RuntimeError(f"Collection {name} does not exist")
+        await create_alias(client, name, orphan)
+        logger.info(f"Restored {name} as an alias of {orphan}, run again to rebuild")
+        return
+
+    source, is_alias = await resolve_source(vector_store)
+    target = f"{name}_{int(time.time() * 1000)}"
+
+    await vector_store.create_collection(target)
+    logger.info(f"Created {target}, copying points from {source}")
+    copied = await copy_points(vector_store, source, target, batch_size)
+
+    source_count = (await client.count(collection_name=source, exact=True)).count
+    if source_count != copied:
+        raise RuntimeError(f"Copied {copied} points but {source} holds {source_count}, was ingestion running?")
+
+    if is_alias:
+        await client.update_collection_aliases(change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name)),
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=name))
+        ])
+        if not keep_old:
+            await client.delete_collection(source)
+    else:
+        # An alias cannot share its name with a collection, so the original has to go first.
+        # The copy was verified above, so a failure from here on leaves every point in target
+        await client.delete_collection(source)
+        await create_alias(client, name, target)
+    logger.info(f"{name} now points to {target}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--in-place", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--keep-old", action="store_true")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    qdrant_client = AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+    vector_store = VectorStoreModel(qdrant_client)
+    try:
+        if args.in_place:
+            await update_in_place(vector_store)
+        else:
+            await rebuild(vector_store, args.batch_size, args.keep_old)
+    finally:
+        await qdrant_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
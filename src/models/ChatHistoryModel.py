@@ -1,17 +1,48 @@
 from src.models.BaseDataModel import BaseDataModel
 from src.models.schemas.ChatHistorySchema import ChatHistorySchema
+from src.models.ChatHistoryWriteBuffer import ChatHistoryWriteBuffer
+from src.modules.cache.chat_history_cache import ChatHistoryCache
+import asyncio
+import base64
 import logging
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
 from pymongo.errors import PyMongoError
-from typing import List
+from typing import List, Optional
 from src.models.enums.ChatHistoryEnum import ChatHistoryEnum
 
 class ChatHistoryModel(BaseDataModel):
+    # Fields the prompt needs from past turns; chunk references are never read back
+    HISTORY_PROJECTION = {
+        "user_id": 1,
+        "chat_id": 1,
+        "question": 1,
+        "answer": 1,
+        "metadata.timestamp": 1
+    }
 
     def __init__(self, db_client: object):
         super().__init__(db_client)
         self.collection_name = ChatHistoryEnum.CHAT_HISTORY_COLLECTION.value
         self.collection = self.db_client[self.collection_name]
         self.logger = logging.getLogger(__name__)
+        self.write_buffer = None
+        if self.settings.CHAT_HISTORY_WRITE_BEHIND:
+            self.write_buffer = ChatHistoryWriteBuffer(
+                self.collection,
+                flush_size=self.settings.CHAT_HISTORY_FLUSH_SIZE,
+                flush_interval=self.settings.CHAT_HISTORY_FLUSH_INTERVAL,
+                journal_path=self.settings.CHAT_HISTORY_JOURNAL_PATH
+            )
+        self.cache = None
+        if self.settings.CHAT_HISTORY_CACHE_ENABLED:
+            self.cache = ChatHistoryCache(
+                max_entries=self.settings.CHAT_HISTORY_CACHE_USERS,
+                turns=self.settings.CHAT_HISTORY_CACHE_TURNS,
+                ttl=self.settings.CHAT_HISTORY_CACHE_TTL_SECONDS
+            )
+        self.watcher = None
 
 
     @classmethod
@@ -19,6 +50,10 @@ class ChatHistoryModel(BaseDataModel):
         try:
             instance = cls(db_client)
             await instance.init_collection()
+            if instance.write_buffer:
+                await instance.write_buffer.start()
+            if instance.cache and instance.settings.CHAT_HISTORY_CACHE_WATCH:
+                instance.watcher = asyncio.create_task(instance.watch_changes())
             return instance
         except Exception as e:
             logging.error(f"Error creating ChatHistoryModel instance: {str(e)}")
@@ -27,17 +62,12 @@ class ChatHistoryModel(BaseDataModel):
 
     async def init_collection(self):
         try:
+            # create_index is a no-op for indexes that already exist
+            indexes = await ChatHistorySchema.get_indexes()
+            for index in indexes:
+                await self.collection.create_index(index)
+            self.logger.info(f"Collection {self.collection_name} initialized successfully")
 
-            all_collections = await self.db_client.list_collection_names()
-            if self.collection_name not in all_collections:
-                await self.db_client.create_collection(self.collection_name)
-                indexes = await ChatHistorySchema.get_indexes()
-                for index in indexes:
-                    await self.collection.create_index(index)
-                self.logger.info(f"Collection {self.collection_name} initialized successfully")
-            else:
-                self.logger.info(f"Collection {self.collection_name} already exists")
-        
         except PyMongoError as e:
             self.logger.error(f"Error initializing collection: {str(e)}")
             raise
@@ -46,11 +76,25 @@ class ChatHistoryModel(BaseDataModel):
             raise
 
     
+    async def close(self):
+        if self.watcher:
+            self.watcher.cancel()
+            await asyncio.gather(self.watcher, return_exceptions=True)
+            self.watcher = None
+        if self.write_buffer:
+            await self.write_buffer.close()
+
+
     async def save_chat_history(self, chat_history: ChatHistorySchema) -> bool:
         try:
 
             formatted_chat = await self.format_chat_history(chat_history)
-            await self.collection.insert_one(formatted_chat)
+            if self.write_buffer:
+                await self.write_buffer.add(formatted_chat)
+            else:
+                await self.collection.insert_one(formatted_chat)
+            if self.cache:
+                self.cache.append((formatted_chat["user_id"], formatted_chat["chat_id"]), formatted_chat)
             return True
         
         except PyMongoError as e:
@@ -65,12 +109,15 @@ class ChatHistoryModel(BaseDataModel):
         try:
 
             return {
+                "_id": chat_history.id or ObjectId(),
                 "user_id": chat_history.user_id,
                 "chat_id": chat_history.chat_id,
                 "question": chat_history.question,
                 "answer": chat_history.answer,
                 "metadata": {
-                    "similar_chunks": chat_history.metadata.similar_chunks,
+                    "similar_chunks": [
+                        chunk.model_dump() for chunk in chat_history.metadata.similar_chunks or []
+                    ],
                     "timestamp": chat_history.metadata.timestamp
                 }
             }
@@ -80,14 +127,24 @@ class ChatHistoryModel(BaseDataModel):
             raise
 
 
-    async def get_chat_history(self, user_id: str, limit: int = 10) -> List[dict]:
+    async def get_chat_history(self, user_id: str, chat_id: str, limit: int = 10) -> List[dict]:
         try:
 
-            chat_history = self.collection.find(
-                {"user_id": user_id}
-            ).sort("metadata.timestamp", -1).limit(limit)
-
-            return await chat_history.to_list(length=limit)
+            if self.cache:
+                cached = self.cache.get((user_id, chat_id), limit)
+                if cached is not None:
+                    return cached
+                # Read a full ring buffer's worth so later, shorter reads are hits
+                read_limit = max(limit, self.cache.turns)
+            else:
+                read_limit = limit
+
+            chat_history = await self.find_page(user_id, chat_id, read_limit)
+            if self.write_buffer:
+                chat_history = await self.merge_pending(chat_history, self.write_buffer.pending_for(user_id, chat_id), read_limit)
+            if self.cache:
+                self.cache.fill((user_id, chat_id), chat_history)
+            return chat_history[:limit]
         
         except PyMongoError as e:
             self.logger.error(f"Database error while fetching chat history: {str(e)}")
@@ -97,21 +154,91 @@ class ChatHistoryModel(BaseDataModel):
             raise
     
 
-    async def get_chat_history_by_chat_id(self, company_id: str, chat_id: str, limit: int = 10) -> List[dict]:
+    async def get_chat_history_page(self, user_id: str, chat_id: str, limit: int = 10, cursor: Optional[str] = None) -> dict:
+        """Newest-first page of a conversation, continued from an opaque keyset cursor."""
         try:
-        
-            chat_history = await self.collection.find(
-                {"company_id": company_id, "chat_id": chat_id}
-            ).sort("metadata.timestamp", -1).limit(limit)
-            return await chat_history.to_list(length=limit)
-        
+
+            after = self.decode_cursor(cursor) if cursor else None
+            chat_history = await self.find_page(user_id, chat_id, limit, after)
+            if self.write_buffer and after is None:
+                chat_history = await self.merge_pending(chat_history, self.write_buffer.pending_for(user_id, chat_id), limit)
+
+            next_cursor = self.encode_cursor(chat_history[-1]) if len(chat_history) == limit else None
+            return {
+                "chat_history": chat_history,
+                "next_cursor": next_cursor
+            }
+
         except PyMongoError as e:
             self.logger.error(f"Database error while fetching chat history by chat_id: {str(e)}")
             raise
         except Exception as e:
             self.logger.error(f"Unexpected error while fetching chat history by chat_id: {str(e)}")
             raise
-    
 
 
+    async def find_page(self, user_id: str, chat_id: str, limit: int, after: Optional[tuple] = None) -> List[dict]:
+        query = {"user_id": user_id, "chat_id": chat_id}
+        if after:
+            timestamp, last_id = after
+            query["$or"] = [
+                {"metadata.timestamp": {"$lt": timestamp}},
+                {"metadata.timestamp": timestamp, "_id": {"$lt": last_id}}
+            ]
 
+        chat_history = self.collection.find(
+            query,
+            self.HISTORY_PROJECTION
+        ).sort([("metadata.timestamp", -1), ("_id", -1)]).limit(limit)
+        return await chat_history.to_list(length=limit)
+
+
+    @staticmethod
+    def encode_cursor(chat: dict) -> str:
+        raw = f"{chat['metadata']['timestamp'].isoformat()}|{chat['_id']}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            timestamp, last_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+            return datetime.fromisoformat(timestamp), ObjectId(last_id)
+        except (ValueError, InvalidId, UnicodeError) as e:
+            raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
+    async def merge_pending(self, chat_history: List[dict], pending: List[dict], limit: int) -> List[dict]:
+        if not pending:
+            return chat_history
+
+        merged = {chat["_id"]: chat for chat in chat_history}
+        for chat in pending:
+            merged.setdefault(chat["_id"], chat)
+        return sorted(merged.values(), key=lambda chat: (chat["metadata"]["timestamp"], chat["_id"]), reverse=True)[:limit]
+
+
+    async def invalidate_cache(self, user_id: str = None, chat_id: str = None):
+        if not self.cache:
+            return
+        if user_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate((user_id, chat_id))
+
+
+    async def watch_changes(self):
+        # Keeps the cache correct when other workers write; needs a replica set
+        try:
+            async with self.collection.watch() as stream:
+                async for change in stream:
+                    if change["operationType"] != "insert":
+                        await self.invalidate_cache()
+                        continue
+                    chat = change["fullDocument"]
+                    if not self.cache.contains((chat["user_id"], chat["chat_id"]), chat["_id"]):
+                        await self.invalidate_cache(chat["user_id"], chat["chat_id"])
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            self.logger.error(f"Chat history change stream stopped, relying on cache TTL: {str(e)}")
@@ -0,0 +1,209 @@
+import asyncio
+import fcntl
+import logging
+import os
+from typing import List, Optional
+from bson import json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class ChatHistoryWriteBuffer:
+    """Write-behind buffer for chat history documents.
+
+    `add` returns immediately; documents are written with `insert_many` once
+    `flush_size` are waiting or every `flush_interval` seconds. Batches that
+    cannot be written are appended to a local journal and replayed on the next
+    successful flush. Documents carry client-side `_id`s, so replaying a batch
+    that partially reached Mongo is harmless. Journal records that cannot be
+    decoded or encoded are moved aside to `<journal_path>.rejected`.
+    """
+    def __init__(self, collection, flush_size: int, flush_interval: float, journal_path: str):
+        self.collection = collection
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.journal_path = journal_path
+        self.logger = logging.getLogger(__name__)
+
+        self.pending: List[dict] = []
+        self.in_flight: List[dict] = []
+        self.flush_lock = asyncio.Lock()
+        self.flush_event = asyncio.Event()
+        self.flusher: Optional[asyncio.Task] = None
+
+
+    async def start(self):
+        try:
+            await self.replay_journal()
+        except Exception as e:
+            self.logger.error(f"Error replaying chat history journal: {e}")
+        self.flusher = asyncio.create_task(self.run_flusher())
+
+
+    async def close(self):
+        if self.flusher:
+            self.flusher.cancel()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+            self.flusher = None
+        await self.flush()
+
+
+    async def add(self, document: dict):
+        self.pending.append(document)
+        if len(self.pending) >= self.flush_size:
+            self.flush_event.set()
+
+
+    def pending_for(self, user_id: str, chat_id: str) -> List[dict]:
+        # Lets a user read their own turns before they reach Mongo
+        return [
+            doc for doc in self.in_flight + self.pending
+            if doc["user_id"] == user_id and doc["chat_id"] == chat_id
+        ]
+
+
+    async def run_flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_event.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error in chat history flusher: {e}")
+
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+
+            self.in_flight, self.pending = self.pending, []
+            try:
+                try:
+                    await self.replay_journal()
+                except Exception as e:
+                    self.logger.error(f"Error replaying chat history journal: {e}")
+
+                await self.insert(self.in_flight)
+                self.logger.info(f"Flushed {len(self.in_flight)} chat history records")
+            except Exception as e:
+                self.logger.error(f"Error flushing chat history, spilling {len(self.in_flight)} records to journal: {e}")
+                try:
+                    await self.spill(self.in_flight)
+                except Exception as e:
+                    self.logger.error(f"Error spilling {len(self.in_flight)} chat history records, records lost: {e}")
+            finally:
+                self.in_flight = []
+
+
+    async def insert(self, documents: List[dict]):
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean the record was already written by an earlier attempt
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errors:
+                raise
+
+
+    async def spill(self, documents: List[dict]):
+        lines = [json_util.dumps(doc) + "\n" for doc in documents]
+        await asyncio.to_thread(self.append_lines, self.journal_path, lines)
+
+
+    async def replay_journal(self):
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return
+
+        # The lock is held across the insert so that workers sharing the
+        # journal never replay the same records twice
+        f = await asyncio.to_thread(self.open_locked, self.journal_path)
+        try:
+            lines = await asyncio.to_thread(f.readlines)
+            documents, rejected = [], []
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    documents.append(json_util.loads(line))
+                except Exception:
+                    rejected.append(line if line.endswith("\n") else line + "\n")
+
+            if documents:
+                rejected += await self.insert_journaled(documents)
+                self.logger.info(f"Replayed {len(documents)} chat history records from journal")
+            if rejected:
+                self.logger.error(f"Moved {len(rejected)} rejected chat history records to {self.rejected_path}")
+                await asyncio.to_thread(self.append_lines, self.rejected_path, rejected)
+
+            await asyncio.to_thread(self.truncate, f)
+        finally:
+            await asyncio.to_thread(self.unlock, f)
+
+
+    async def insert_journaled(self, documents: List[dict]) -> List[str]:
+        # Mongo errors keep the journal for the next attempt; anything else is
+        # a bad record, so retry one by one and hand back the ones to set aside
+        try:
+            await self.insert(documents)
+            return []
+        except PyMongoError:
+            raise
+        except Exception:
+            pass
+
+        rejected = []
+        for document in documents:
+            try:
+                await self.insert([document])
+            except PyMongoError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Rejected chat history record {document.get('_id')}: {e}")
+                rejected.append(json_util.dumps(document) + "\n")
+        return rejected
+
+
+    @property
+    def rejected_path(self) -> str:
+        return f"{self.journal_path}.rejected"
+
+
+    @staticmethod
+    def append_lines(path: str, lines: List[str]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+    @staticmethod
+    def open_locked(path: str):
+        f = open(path, "r+", encoding="utf-8")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return f
+
+
+    @staticmethod
+    def truncate(f):
+        f.seek(0)
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+
+    @staticmethod
+    def unlock(f):
+        try:
+            fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            f.close()
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from src.models.BaseDataModel import BaseDataModel
+from src.models.schemas.IngestionJobSchema import IngestionJobSchema, FileProgress
+from src.models.enums.IngestionJobEnum import IngestionJobEnum, IngestionJobStatusEnum, IngestionFileStatusEnum
+import logging
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from typing import List, Optional
+
+
+class IngestionJobModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client)
+        self.collection_name = IngestionJobEnum.INGESTION_JOB_COLLECTION.value
+        self.collection = self.db_client[self.collection_name]
+        self.logger = logging.getLogger(__name__)
+
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        try:
+            instance = cls(db_client)
+            await instance.init_collection()
+            return instance
+        except Exception as e:
+            logging.error(f"Error creating IngestionJobModel instance: {str(e)}")
+            raise
+
+
+    async def init_collection(self):
+        try:
+            # create_index is a no-op for indexes that already exist
+            indexes = await IngestionJobSchema.get_indexes()
+            for index in indexes:
+                await self.collection.create_index(index)
+            self.logger.info(f"Collection {self.collection_name} initialized successfully")
+
+        except PyMongoError as e:
+            self.logger.error(f"Error initializing collection: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error in init_collection: {str(e)}")
+            raise
+
+
+    async def create_job(self, files: List[dict]) -> str:
+        try:
+            now = datetime.utcnow()
+            job = IngestionJobSchema(
+                status=IngestionJobStatusEnum.QUEUED.value,
+                files=[FileProgress(**file, status=IngestionFileStatusEnum.PENDING.value) for file in files],
+                created_at=now,
+                updated_at=now
+            )
+            result = await self.collection.insert_one(job.model_dump(exclude={"id"}))
+            return str(result.inserted_id)
+
+        except PyMongoError as e:
+            self.logger.error(f"Database error while creating ingestion job: {str(e)}")
+            raise
+
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        try:
+            return await self.collection.find_one({"_id": ObjectId(job_id)})
+        except InvalidId:
+            return None
+        except PyMongoError as e:
+            self.logger.error(f"Database error while fetching ingestion job: {str(e)}")
+            raise
+
+
+    async def claim_job(self, job_id: str, lease_seconds: int) -> Optional[dict]:
+        # Only one worker can hold a job; a crashed worker's lease eventually expires
+        try:
+            now = datetime.utcnow()
+            return await self.collection.find_one_and_update(
+                {
+                    "_id": ObjectId(job_id),
+                    "$or": [
+                        {"status": IngestionJobStatusEnum.QUEUED.value},
+                        {"status": IngestionJobStatusEnum.RUNNING.value, "lease_expires_at": {"$lt": now}}
+                    ]
+                },
+                {"$set": {
+                    "status": IngestionJobStatusEnum.RUNNING.value,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now
+                }},
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while claiming ingestion job: {str(e)}")
+            raise
+
+
+    async def renew_lease(self, job_id: str, lease_seconds: int):
+        try:
+            now = datetime.utcnow()
+            await self.collection.update_one(
+                {"_id": ObjectId(job_id), "status": IngestionJobStatusEnum.RUNNING.value},
+                {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}}
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while renewing ingestion job lease: {str(e)}")
+            raise
+
+
+    async def update_file(self, job_id: str, index: int, result: dict):
+        try:
+            status = IngestionFileStatusEnum.COMPLETED.value if result["success"] else IngestionFileStatusEnum.FAILED.value
+            await self.collection.update_one(
+                {"_id": ObjectId(job_id)},
+                {"$set": {
+                    f"files.{index}.status": status,
+                    f"files.{index}.message": result["message"],
+                    f"files.{index}.chunks": result["chunks"],
+                    f"files.{index}.unchanged_chunks": result["unchanged_chunks"],
+                    f"files.{index}.failed_chunks": result["failed_chunks"],
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while updating ingestion job file: {str(e)}")
+            raise
+
+
+    async def finish_job(self, job_id: str, status: str, error: Optional[str] = None):
+        try:
+            await self.collection.update_one(
+                {"_id": ObjectId(job_id)},
+                {"$set": {"status": status, "error": error, "updated_at": datetime.utcnow()},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while finishing ingestion job: {str(e)}")
+            raise
+
+
+    async def release_job(self, job_id: str):
+        try:
+            await self.collection.update_one(
+                {"_id": ObjectId(job_id), "status": IngestionJobStatusEnum.RUNNING.value},
+                {"$set": {"status": IngestionJobStatusEnum.QUEUED.value, "updated_at": datetime.utcnow()},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+        except PyMongoError as e:
+            self.logger.error(f"Database error while releasing ingestion job: {str(e)}")
+            raise
+
+
+    async def get_resumable_job_ids(self) -> List[str]:
+        try:
+            cursor = self.collection.find(
+                {"$or": [
+                    {"status": IngestionJobStatusEnum.QUEUED.value},
+                    {"status": IngestionJobStatusEnum.RUNNING.value, "lease_expires_at": {"$lt": datetime.utcnow()}}
+                ]},
+                {"_id": 1}
+            ).sort("created_at", 1)
+            return [str(job["_id"]) async for job in cursor]
+        except PyMongoError as e:
+            self.logger.error(f"Database error while listing resumable ingestion jobs: {str(e)}")
+            raise
@@ -0,0 +1,67 @@
+from datetime import datetime
+from src.models.BaseDataModel import BaseDataModel
+from src.models.enums.TranslationCacheEnum import TranslationCacheEnum
+import logging
+from pymongo.errors import PyMongoError
+from typing import Optional
+
+
+class TranslationCacheModel(BaseDataModel):
+    """Shared tier of the query translation cache; Mongo expires entries by TTL index."""
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client)
+        self.collection_name = TranslationCacheEnum.TRANSLATION_CACHE_COLLECTION.value
+        self.collection = self.db_client[self.collection_name]
+        self.logger = logging.getLogger(__name__)
+
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        try:
+            instance = cls(db_client)
+            await instance.init_collection()
+            return instance
+        except Exception as e:
+            logging.error(f"Error creating TranslationCacheModel instance: {str(e)}")
+            raise
+
+
+    async def init_collection(self):
+        try:
+            await self.collection.create_index(
+                "created_at",
+                expireAfterSeconds=int(self.settings.TRANSLATION_CACHE_TTL_SECONDS)
+            )
+            self.logger.info(f"Collection {self.collection_name} initialized successfully")
+
+        except PyMongoError as e:
+            self.logger.error(f"Error initializing collection: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error in init_collection: {str(e)}")
+            raise
+
+
+    async def get_translation(self, key: str) -> Optional[str]:
+        try:
+            entry = await self.collection.find_one({"_id": key}, {"translation": 1})
+            return entry["translation"] if entry else None
+
+        except PyMongoError as e:
+            self.logger.error(f"Database error while reading translation: {str(e)}")
+            raise
+
+
+    async def save_translation(self, key: str, translation: str) -> bool:
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"translation": translation, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+            return True
+
+        except PyMongoError as e:
+            self.logger.error(f"Database error while saving translation: {str(e)}")
+            raise
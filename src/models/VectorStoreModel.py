@@ -1,21 +1,42 @@
 from datetime import datetime
+import hashlib
 import uuid
 from src.models.BaseDataModel import BaseDataModel
 from src.models.schemas.VectorStoreSchema import VectorStoreMetadata, VectorStoreSchema
 import logging
-from typing import Any, Dict, List, Optional
-from qdrant_client.http.models import PointStruct, VectorParams, Distance
+from typing import Any, Dict, List, Optional, Set
+from qdrant_client.http.models import PointStruct, VectorParams, Distance, Filter, FieldCondition, MatchValue, HasIdCondition, FilterSelector
+from qdrant_client.http.models import SparseVectorParams, SparseVector, Modifier, Prefetch, FusionQuery, Fusion, PayloadSchemaType
+from qdrant_client.http.models import HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization
+from qdrant_client.http.models import BinaryQuantizationConfig, SearchParams, QuantizationSearchParams
 from qdrant_client.http.exceptions import UnexpectedResponse
 import numpy as np
-from src.models.enums.VectorStoreEnum import VectorStoreEnum
+from src.models.enums.VectorStoreEnum import VectorStoreEnum, VectorQuantizationEnum
+from src.modules.rag.sparse_encoding import BM25Encoder
+
+
+# Namespace for deterministic chunk ids derived from (file_id, chunk_order)
+CHUNK_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "fusion-ed/chunks")
 
 
 class VectorStoreModel(BaseDataModel):
+    # Payload fields searches and maintenance filter on
+    PAYLOAD_INDEXES = {
+        "course_id": PayloadSchemaType.KEYWORD,
+        "file_id": PayloadSchemaType.KEYWORD,
+        "file_name": PayloadSchemaType.KEYWORD
+    }
+
     def __init__(self, db_client: object):
         super().__init__(db_client)
         self.logger = logging.getLogger(__name__)
         self.collection_name = VectorStoreEnum.VECTOR_STORE_COLLECTION.value
+        self.sparse_vector_name = VectorStoreEnum.SPARSE_VECTOR_NAME.value
         self.qdrant_client = self.db_client
+        self.sparse_encoder = BM25Encoder()
+        # Set by init_collection once the collection is known to have the sparse vector
+        self.hybrid = False
+        self.search_params = self.make_search_params()
 
 
     @classmethod
@@ -31,19 +52,19 @@ class VectorStoreModel(BaseDataModel):
     async def init_collection(self):
         try:
             # Check if collection exists
-            collections = await self.qdrant_client.get_collections()
-            if not any(c.name == self.collection_name for c in collections.collections):
-                await self.qdrant_client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.settings.EMBEDDING_SIZE,
-                        distance=Distance.COSINE
-                    )
-                )
-
+            if not await self.collection_exists(self.collection_name):
+                await self.create_collection(self.collection_name)
                 self.logger.info(f"Created Qdrant collection: {self.collection_name}")
             else:
                 self.logger.info(f"Collection {self.collection_name} already exists")
+
+            collection = await self.qdrant_client.get_collection(self.collection_name)
+            await self.init_payload_indexes(collection.payload_schema or {})
+
+            if self.settings.HYBRID_SEARCH_ENABLED:
+                self.hybrid = self.sparse_vector_name in (collection.config.params.sparse_vectors or {})
+                if not self.hybrid:
+                    self.logger.warning(f"Collection {self.collection_name} has no sparse vector, using dense search only")
         except UnexpectedResponse as e:
             self.logger.error(f"Qdrant API error while initializing collection: {str(e)}")
             raise
@@ -52,7 +73,93 @@ class VectorStoreModel(BaseDataModel):
             raise
 
 
-    async def save_chunks(self, documents_with_embeddings: List[Dict[str, Any]]) -> bool:
+    async def collection_exists(self, collection_name: str) -> bool:
+        # The name may be an alias after a rebuild (see src/migrations/rebuild_vector_collection.py)
+        collections = await self.qdrant_client.get_collections()
+        if any(c.name == collection_name for c in collections.collections):
+            return True
+        aliases = await self.qdrant_client.get_aliases()
+        return any(alias.alias_name == collection_name for alias in aliases.aliases)
+
+
+    async def create_collection(self, collection_name: str):
+        sparse_vectors_config = None
+        if self.settings.HYBRID_SEARCH_ENABLED:
+            sparse_vectors_config = {self.sparse_vector_name: SparseVectorParams(modifier=Modifier.IDF)}
+
+        await self.qdrant_client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(
+                size=self.settings.EMBEDDING_SIZE,
+                distance=Distance.COSINE,
+                on_disk=self.settings.QDRANT_VECTORS_ON_DISK
+            ),
+            sparse_vectors_config=sparse_vectors_config,
+            hnsw_config=self.make_hnsw_config(),
+            quantization_config=self.make_quantization_config(),
+            on_disk_payload=self.settings.QDRANT_PAYLOAD_ON_DISK
+        )
+        await self.init_payload_indexes({}, collection_name)
+
+
+    def make_hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(
+            m=self.settings.QDRANT_HNSW_M,
+            ef_construct=self.settings.QDRANT_HNSW_EF_CONSTRUCT,
+            on_disk=self.settings.QDRANT_HNSW_ON_DISK
+        )
+
+
+    def make_quantization_config(self):
+        # Quantized vectors stay in RAM for the HNSW walk; originals can live on disk for rescoring
+        quantization = self.settings.QDRANT_QUANTIZATION
+        always_ram = self.settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+        if quantization == VectorQuantizationEnum.SCALAR.value:
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=always_ram))
+        if quantization == VectorQuantizationEnum.BINARY.value:
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+        return None
+
+
+    def make_search_params(self) -> SearchParams:
+        # Runs in __init__, so a mistyped mode fails at startup instead of silently disabling quantization
+        modes = [mode.value for mode in VectorQuantizationEnum]
+        if self.settings.QDRANT_QUANTIZATION not in modes:
+            raise ValueError(f"QDRANT_QUANTIZATION is {self.settings.QDRANT_QUANTIZATION!r}, expected one of {modes}")
+
+        quantization = None
+        if self.settings.QDRANT_QUANTIZATION != VectorQuantizationEnum.NONE.value:
+            quantization = QuantizationSearchParams(
+                rescore=self.settings.QDRANT_QUANTIZATION_RESCORE,
+                oversampling=self.settings.QDRANT_QUANTIZATION_OVERSAMPLING
+            )
+        return SearchParams(hnsw_ef=self.settings.QDRANT_SEARCH_HNSW_EF or None, quantization=quantization)
+
+
+    async def init_payload_indexes(self, payload_schema: dict, collection_name: Optional[str] = None):
+        # Only missing indexes are created, existing collections get them on their next start
+        for field_name, field_schema in self.PAYLOAD_INDEXES.items():
+            if field_name in payload_schema:
+                continue
+            await self.qdrant_client.create_payload_index(
+                collection_name=collection_name or self.collection_name,
+                field_name=field_name,
+                field_schema=field_schema
+            )
+            self.logger.info(f"Created payload index on {field_name}")
+
+
+    @staticmethod
+    def make_scope_filter(course_id: Optional[str] = None, file_id: Optional[str] = None) -> Optional[Filter]:
+        conditions = []
+        if course_id:
+            conditions.append(FieldCondition(key="course_id", match=MatchValue(value=course_id)))
+        if file_id:
+            conditions.append(FieldCondition(key="file_id", match=MatchValue(value=file_id)))
+        return Filter(must=conditions) if conditions else None
+
+
+    async def save_chunks(self, documents_with_embeddings: List[Dict[str, Any]], wait: bool = True) -> bool:
         try:
 
             points = []
@@ -66,9 +173,14 @@ class VectorStoreModel(BaseDataModel):
                 metadata["chunk_order"] = metadata["chunk_order"]
                 metadata["current_date"] = datetime.now().strftime("%Y-%m-%d")
                 metadata["text"] = chunk["text"]
+                metadata["content_hash"] = metadata.get("content_hash") or self.make_content_hash(chunk["text"])
                 embedding = chunk["embedding"]
+                if self.hybrid:
+                    sparse = self.sparse_encoder.encode_document(chunk["text"])
+                    embedding = {"": embedding, self.sparse_vector_name: SparseVector(**sparse)}
 
-                point_id = str(uuid.uuid4())
+                # Re-uploading a file overwrites its chunks instead of duplicating them
+                point_id = self.make_point_id(metadata["file_id"], metadata["chunk_order"])
                 point = PointStruct(
                     id=point_id,
                     vector=embedding,
@@ -77,9 +189,11 @@ class VectorStoreModel(BaseDataModel):
                 points.append(point)
 
             # Insert point into collection
+            # wait=False returns once Qdrant has accepted the batch, before it is indexed
             await self.qdrant_client.upsert(
                 collection_name=self.collection_name,
-                points=points
+                points=points,
+                wait=wait
             )
             return True
         except UnexpectedResponse as e:
@@ -90,21 +204,137 @@ class VectorStoreModel(BaseDataModel):
             raise
 
 
+    @staticmethod
+    def make_point_id(file_id: str, chunk_order: int) -> str:
+        return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{file_id}:{chunk_order}"))
+
+
+    @staticmethod
+    def make_content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+    async def get_file_chunk_hashes(self, file_id: str) -> Dict[str, Optional[str]]:
+        try:
+            chunk_hashes = {}
+            offset = None
+            while True:
+                points, offset = await self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=Filter(must=[FieldCondition(key="file_id", match=MatchValue(value=file_id))]),
+                    limit=256,
+                    offset=offset,
+                    with_payload=["content_hash"],
+                    with_vectors=False
+                )
+                for point in points:
+                    chunk_hashes[str(point.id)] = (point.payload or {}).get("content_hash")
+                if offset is None:
+                    return chunk_hashes
+        except UnexpectedResponse as e:
+            self.logger.error(f"Qdrant API error while reading chunk hashes: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error while reading chunk hashes: {str(e)}")
+            raise
+
+
+    async def get_file_chunk_ids(self, file_id: str) -> Dict[int, str]:
+        # Actual point ids by chunk order; chunks indexed before deterministic
+        # ids keep their random ids until the file is re-indexed
+        try:
+            chunk_ids = {}
+            offset = None
+            while True:
+                points, offset = await self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=Filter(must=[FieldCondition(key="file_id", match=MatchValue(value=file_id))]),
+                    limit=256,
+                    offset=offset,
+                    with_payload=["chunk_order"],
+                    with_vectors=False
+                )
+                for point in points:
+                    chunk_order = (point.payload or {}).get("chunk_order")
+                    if chunk_order is not None:
+                        chunk_ids[int(chunk_order)] = str(point.id)
+                if offset is None:
+                    return chunk_ids
+        except UnexpectedResponse as e:
+            self.logger.error(f"Qdrant API error while reading chunk ids: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error while reading chunk ids: {str(e)}")
+            raise
+
+
+    async def get_file_names(self, limit: int) -> Set[str]:
+        # Distinct values from the file_name payload index, so the cost follows
+        # the number of files rather than the number of chunks
+        try:
+            response = await self.qdrant_client.facet(
+                collection_name=self.collection_name,
+                key="file_name",
+                limit=limit,
+                exact=False
+            )
+            if len(response.hits) >= limit:
+                self.logger.warning(f"Course catalog truncated to {limit} files")
+            return {str(hit.value) for hit in response.hits}
+        except UnexpectedResponse as e:
+            self.logger.error(f"Qdrant API error while reading file names: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error while reading file names: {str(e)}")
+            raise
+
+
+    async def delete_stale_chunks(self, file_id: str, keep_ids: List[str]) -> bool:
+        try:
+            stale_filter = Filter(
+                must=[FieldCondition(key="file_id", match=MatchValue(value=file_id))],
+                must_not=[HasIdCondition(has_id=keep_ids)] if keep_ids else None
+            )
+            await self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=stale_filter)
+            )
+            return True
+        except UnexpectedResponse as e:
+            self.logger.error(f"Qdrant API error while deleting stale chunks: {str(e)}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error while deleting stale chunks: {str(e)}")
+            raise
+
+
     async def search_similar_chunks(self, 
                                   query_vector: List[float], 
                                   limit: int = 10,
-                                  score_threshold: float = 0.7) -> List[VectorStoreSchema]:
+                                  score_threshold: float = 0.7,
+                                  query_text: Optional[str] = None,
+                                  course_id: Optional[str] = None,
+                                  file_id: Optional[str] = None) -> List[VectorStoreSchema]:
         try:
+            # Filtered in the index, so scoped searches only visit the scope's vectors
+            scope_filter = self.make_scope_filter(course_id, file_id)
+            sparse = self.sparse_encoder.encode_query(query_text) if self.hybrid and query_text else None
+            if sparse and sparse["indices"]:
+                return await self.search_hybrid(query_vector, sparse, limit, score_threshold, scope_filter)
+
             # Search for similar vector0s
             search_result = await self.qdrant_client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
+                query_filter=scope_filter,
+                search_params=self.search_params,
                 limit=limit,
                 score_threshold=score_threshold
             )
             # self.logger.info(f"Search result: {search_result}")
             return [
                 {
+                    "id": str(point.id),
                     "text": point.payload["text"],
                     "metadata": point.payload,
                     "score": point.score
@@ -117,6 +347,51 @@ class VectorStoreModel(BaseDataModel):
             raise
 
 
+    async def search_hybrid(self, query_vector: List[float], sparse: dict, limit: int,
+                            score_threshold: float, scope_filter: Optional[Filter]) -> List[VectorStoreSchema]:
+        # Dense and BM25 candidates fused by reciprocal rank. RRF scores only encode
+        # rank, so the fused score is kept as rrf_score and every chunk reports its
+        # cosine as score, including exact-term matches only BM25 found.
+        prefetch_limit = max(limit, self.settings.HYBRID_PREFETCH_LIMIT)
+        response = await self.qdrant_client.query_points(
+            collection_name=self.collection_name,
+            prefetch=[
+                Prefetch(query=query_vector, filter=scope_filter, params=self.search_params,
+                         limit=prefetch_limit, score_threshold=score_threshold),
+                Prefetch(query=SparseVector(**sparse), using=self.sparse_vector_name,
+                         filter=scope_filter, limit=prefetch_limit)
+            ],
+            query_filter=scope_filter,
+            query=FusionQuery(fusion=Fusion.RRF),
+            limit=limit,
+            with_payload=True
+        )
+        fused_points = response.points
+        if not fused_points:
+            return []
+
+        # Cosines for just the fused ids, without the threshold the dense prefetch applied
+        point_ids = [point.id for point in fused_points]
+        dense_response = await self.qdrant_client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector,
+            query_filter=Filter(must=[HasIdCondition(has_id=point_ids)]),
+            search_params=self.search_params,
+            limit=len(point_ids)
+        )
+        dense_scores = {point.id: point.score for point in dense_response.points}
+
+        return [
+            {
+                "id": str(point.id),
+                "text": point.payload["text"],
+                "metadata": point.payload,
+                "score": dense_scores.get(point.id, 0.0),
+                "rrf_score": point.score
+            } for point in fused_points
+        ]
+
+
     async def get_chunk_by_id(self, chunk_id: str) -> Optional[VectorStoreSchema]:
         try:
             point = self.qdrant_client.retrieve(
@@ -0,0 +1,15 @@
+from enum import Enum
+
+class IngestionJobEnum(Enum):
+    INGESTION_JOB_COLLECTION = "fusion_ed_ingestion_jobs"
+
+class IngestionJobStatusEnum(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class IngestionFileStatusEnum(Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -0,0 +1,4 @@
+from enum import Enum
+
+class TranslationCacheEnum(Enum):
+    TRANSLATION_CACHE_COLLECTION = "fusion_ed_translation_cache"
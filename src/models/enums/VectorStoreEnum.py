@@ -2,3 +2,9 @@ from enum import Enum
 
 class VectorStoreEnum(Enum):
     VECTOR_STORE_COLLECTION = "fusion_ed_vector_store"
+    SPARSE_VECTOR_NAME = "bm25"
+
+class VectorQuantizationEnum(Enum):
+    NONE = "none"
+    SCALAR = "scalar"
+    BINARY = "binary"
@@ -1,13 +1,19 @@
 from datetime import datetime
 from bson import ObjectId
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Optional
 from pymongo import ASCENDING, DESCENDING
 
 
 
+class ChunkReference(BaseModel):
+    id: str
+    score: float
+
+
 class Metadata(BaseModel):
-    similar_chunks: Optional[list[Dict]] = None
+    # Qdrant point ids and scores only; the chunk text lives in the vector store
+    similar_chunks: Optional[list[ChunkReference]] = None
     timestamp: Optional[datetime] = None
 
 
@@ -25,8 +31,7 @@ class ChatHistorySchema(BaseModel):
 
     @classmethod
     async def get_indexes(cls):
+        # Serves conversation reads and keyset pages; _id breaks timestamp ties
         return [
-            ("user_id", ASCENDING),
-            ("chat_id", ASCENDING),
-            ("metadata.timestamp", DESCENDING)
+            [("user_id", ASCENDING), ("chat_id", ASCENDING), ("metadata.timestamp", DESCENDING), ("_id", DESCENDING)]
         ]
\ No newline at end of file
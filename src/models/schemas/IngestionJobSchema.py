@@ -0,0 +1,38 @@
+from datetime import datetime
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING
+
+
+class FileProgress(BaseModel):
+    file_id: str
+    file_url: str
+    file_name: str
+    course_id: str
+    status: str
+    message: Optional[str] = None
+    chunks: int = 0
+    unchanged_chunks: int = 0
+    failed_chunks: int = 0
+
+
+class IngestionJobSchema(BaseModel):
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    status: str
+    files: List[FileProgress]
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    lease_expires_at: Optional[datetime] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+    @classmethod
+    async def get_indexes(cls):
+        return [
+            [("status", ASCENDING), ("lease_expires_at", ASCENDING)],
+            [("created_at", DESCENDING)]
+        ]
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+from src.helpers.metrics import get_counters
+from src.modules.BaseModule import BaseModule
+
+
+class AnswerCache(BaseModule):
+    """Semantic cache of generated answers keyed by the translated-query embedding.
+
+    Vectors live in a fixed-size matrix so a lookup is a single matrix-vector
+    product; slots are recycled in LRU order.
+    """
+    def __init__(self):
+        super().__init__()
+        self.enabled = self.settings.ANSWER_CACHE_ENABLED
+        self.max_entries = self.settings.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl = self.settings.ANSWER_CACHE_TTL_SECONDS
+        self.threshold = self.settings.ANSWER_CACHE_SIMILARITY
+        self.metrics = get_counters("answer_cache")
+
+        self.vectors = None
+        self.entries = OrderedDict()
+        self.free_slots = list(range(self.max_entries - 1, -1, -1))
+
+
+    async def lookup(self, query_vector: List[float], catalog_version: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        query = await self.normalize(query_vector)
+        if not self.entries or query.shape[0] != self.vectors.shape[1]:
+            self.metrics.incr("misses")
+            return None
+
+        now = time.monotonic()
+        scores = self.vectors @ query
+        for slot in np.argsort(-scores):
+            slot = int(slot)
+            if scores[slot] < self.threshold:
+                break
+            entry = self.entries.get(slot)
+            if entry is None or entry["catalog_version"] != catalog_version:
+                continue
+            if entry["expires_at"] <= now:
+                await self.evict(slot)
+                continue
+
+            self.entries.move_to_end(slot)
+            self.metrics.incr("hits")
+            return entry
+
+        self.metrics.incr("misses")
+        return None
+
+
+    async def store(self, query_vector: List[float], catalog_version: str, answer: str, similar_chunks: list, latency: float):
+        if not self.enabled or not answer:
+            return
+
+        vector = await self.normalize(query_vector)
+        if self.vectors is None:
+            self.vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self.vectors.shape[1]:
+            self.logger.warning("Embedding size changed, resetting answer cache")
+            await self.invalidate()
+            self.vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        if not self.free_slots:
+            oldest_slot = next(iter(self.entries))
+            await self.evict(oldest_slot)
+
+        slot = self.free_slots.pop()
+        self.vectors[slot] = vector
+        self.entries[slot] = {
+            "answer": answer,
+            "similar_chunks": similar_chunks,
+            "catalog_version": catalog_version,
+            "latency": latency,
+            "expires_at": time.monotonic() + self.ttl
+        }
+        self.metrics.incr("stores")
+
+
+    async def record_saved_latency(self, seconds: float):
+        self.metrics.incr("saved_seconds", max(seconds, 0.0))
+
+
+    async def evict(self, slot: int):
+        self.entries.pop(slot, None)
+        if self.vectors is not None:
+            self.vectors[slot] = 0.0
+        self.free_slots.append(slot)
+        self.metrics.incr("evictions")
+
+
+    async def invalidate(self):
+        self.entries.clear()
+        self.vectors = None
+        self.free_slots = list(range(self.max_entries - 1, -1, -1))
+        self.metrics.incr("invalidations")
+        self.logger.info("Answer cache invalidated")
+
+
+    async def normalize(self, vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
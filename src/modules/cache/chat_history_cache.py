@@ -0,0 +1,47 @@
+from collections import deque
+from typing import Hashable, List, Optional
+from src.helpers.metrics import get_counters
+from src.modules.cache.ttl_cache import TTLCache
+
+
+class ChatHistoryCache:
+    """Most recent turns per (user_id, chat_id), newest first.
+
+    Each key holds a ring buffer of at most `turns` records inside an LRU over
+    keys with a per-entry TTL. A buffer is only created from a database read,
+    so it always holds the complete tail of the conversation; saves append to
+    an existing buffer and never create one.
+    """
+    def __init__(self, max_entries: int, turns: int, ttl: float):
+        self.turns = turns
+        self.entries = TTLCache(max_entries, ttl=ttl)
+        self.metrics = get_counters("chat_history_cache")
+
+    def get(self, key: Hashable, limit: int) -> Optional[List[dict]]:
+        buffer = self.entries.get(key) if limit <= self.turns else None
+        if buffer is None:
+            self.metrics.incr("misses")
+            return None
+
+        self.metrics.incr("hits")
+        return list(buffer)[:limit]
+
+    def fill(self, key: Hashable, chat_history: List[dict]) -> None:
+        self.entries.set(key, deque(chat_history[:self.turns], maxlen=self.turns))
+
+    def append(self, key: Hashable, chat: dict) -> None:
+        buffer = self.entries.get(key)
+        if buffer is not None:
+            buffer.appendleft(chat)
+
+    def contains(self, key: Hashable, chat_id) -> bool:
+        buffer = self.entries.get(key)
+        return buffer is not None and any(chat["_id"] == chat_id for chat in buffer)
+
+    def invalidate(self, key: Hashable) -> None:
+        if self.entries.pop(key) is not None:
+            self.metrics.incr("invalidations")
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.metrics.incr("clears")
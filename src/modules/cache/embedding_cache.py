@@ -0,0 +1,176 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List
+import numpy as np
+from src.helpers.metrics import get_counters
+from src.modules.BaseModule import BaseModule
+from src.modules.cache.ttl_cache import TTLCache
+
+
+class EmbeddingCache(BaseModule):
+    """Two-tier embedding cache for one embedding model.
+
+    The memory tier is an LRU of recently used float32 vectors. The disk tier
+    is an append-only float32 matrix (`vectors.f32`, read through a memmap)
+    plus an append-only `index.tsv` mapping each key to its row. Appends are
+    guarded by a file lock so several workers can share one directory. Disk
+    I/O runs in a thread so it never blocks the event loop.
+    """
+    _instances: Dict[str, "EmbeddingCache"] = {}
+
+    def __init__(self, model_name: str):
+        super().__init__()
+        self.model_name = model_name
+        self.memory = TTLCache(self.settings.EMBEDDING_CACHE_MEMORY_ENTRIES)
+        self.metrics = get_counters("embedding_cache")
+
+        self.directory = os.path.join(self.settings.EMBEDDING_CACHE_DIR, re.sub(r"[^\w.-]+", "_", model_name))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.tsv")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, ".lock")
+
+        self.index = {}
+        self.index_offset = 0
+        self.dim = None
+        self.vectors = None
+        self.disk_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.load_meta()
+        self.refresh_index()
+
+
+    @classmethod
+    def get_instance(cls, model_name: str) -> "EmbeddingCache":
+        if model_name not in cls._instances:
+            cls._instances[model_name] = cls(model_name)
+        return cls._instances[model_name]
+
+
+    def make_key(self, text: str, document_type: str) -> str:
+        return hashlib.sha256(f"{document_type}\0{text}".encode("utf-8")).hexdigest()
+
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        disk_keys = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                disk_keys.append(key)
+
+        if disk_keys:
+            for key, vector in (await asyncio.to_thread(self.read_rows, disk_keys)).items():
+                self.memory.set(key, vector)
+                found[key] = vector
+
+        self.metrics.incr("hits", len(found))
+        self.metrics.incr("misses", len(set(keys) - set(found)))
+        return found
+
+
+    async def put_many(self, vectors: Dict[str, List[float]]):
+        if not vectors:
+            return
+
+        vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in vectors.items()}
+        for key, vector in vectors.items():
+            self.memory.set(key, vector)
+
+        try:
+            await asyncio.to_thread(self.append, vectors)
+        except OSError as e:
+            self.logger.error(f"Error writing embedding cache to disk: {e}")
+
+
+    def append(self, vectors: Dict[str, np.ndarray]):
+        with self.disk_lock:
+            matrix = np.stack(list(vectors.values()))
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif matrix.shape[1] != self.dim:
+                self.logger.warning(f"Embedding size {matrix.shape[1]} does not match cache size {self.dim}, skipping disk tier")
+                return
+
+            with open(self.lock_path, "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    self.refresh_index()
+                    new_keys = [key for key in vectors if key not in self.index]
+                    if not new_keys:
+                        return
+                    rows = np.stack([vectors[key] for key in new_keys])
+
+                    first_row = os.path.getsize(self.vectors_path) // (self.dim * 4) if os.path.exists(self.vectors_path) else 0
+                    with open(self.vectors_path, "ab") as f:
+                        f.write(rows.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    # The index is written last so readers never see a row that is not on disk yet
+                    with open(self.index_path, "a", encoding="utf-8") as f:
+                        f.write("".join(f"{key}\t{first_row + i}\n" for i, key in enumerate(new_keys)))
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+            self.refresh_index()
+
+
+    def read_rows(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self.disk_lock:
+            if any(key not in self.index for key in keys):
+                # Other workers may have appended since we last looked
+                self.refresh_index()
+
+            found = {}
+            for key in keys:
+                vector = self.read_row(key)
+                if vector is not None:
+                    found[key] = vector
+            return found
+
+
+    def load_meta(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+
+
+    def refresh_index(self):
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, "rb") as f:
+            f.seek(self.index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                key, row = line.decode("utf-8").rstrip("\n").split("\t")
+                self.index[key] = int(row)
+                self.index_offset += len(line)
+
+        if self.dim is None:
+            self.load_meta()
+
+
+    def read_row(self, key: str):
+        row = self.index.get(key)
+        if row is None or self.dim is None:
+            return None
+
+        if self.vectors is None or row >= self.vectors.shape[0]:
+            rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+            if row >= rows:
+                return None
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+        # Copied out of the memmap so cached vectors do not pin the mapping
+        return np.array(self.vectors[row])
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional
+from src.helpers.metrics import get_counters
+from src.modules.BaseModule import BaseModule
+from src.modules.cache.ttl_cache import TTLCache
+
+
+class TranslationCache(BaseModule):
+    """Memoises query translations per worker, optionally backed by a shared Mongo tier.
+
+    Identical requests that arrive while a translation is being computed wait
+    on the same task instead of each calling the LLM. The task is shielded, so
+    a caller that disconnects does not cancel it for the others.
+    """
+    def __init__(self, shared_store=None):
+        super().__init__()
+        self.enabled = self.settings.TRANSLATION_CACHE_ENABLED
+        self.entries = TTLCache(self.settings.TRANSLATION_CACHE_MAX_ENTRIES, ttl=self.settings.TRANSLATION_CACHE_TTL_SECONDS)
+        self.shared_store = shared_store
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.metrics = get_counters("translation_cache")
+
+
+    @staticmethod
+    def make_key(question: str, history_fingerprint: str, model_id: Optional[str]) -> str:
+        return hashlib.sha256(f"{model_id}\0{history_fingerprint}\0{question}".encode("utf-8")).hexdigest()
+
+
+    async def get_or_translate(self, key: str, translate: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        if not self.enabled:
+            return await translate()
+
+        translation = self.entries.get(key)
+        if translation is not None:
+            self.metrics.incr("hits")
+            return translation
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.load(key, translate))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.finish(key, done))
+        else:
+            self.metrics.incr("coalesced")
+
+        return await asyncio.shield(task)
+
+
+    async def load(self, key: str, translate: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        if self.shared_store:
+            try:
+                translation = await self.shared_store.get_translation(key)
+            except Exception as e:
+                self.logger.error(f"Error reading shared translation cache: {e}")
+                translation = None
+            if translation is not None:
+                self.metrics.incr("shared_hits")
+                self.entries.set(key, translation)
+                return translation
+
+        self.metrics.incr("misses")
+        translation = await translate()
+        # Failed translations are not cached so the next request retries
+        if translation is None:
+            return None
+
+        self.entries.set(key, translation)
+        if self.shared_store:
+            try:
+                await self.shared_store.save_translation(key, translation)
+            except Exception as e:
+                self.logger.error(f"Error writing shared translation cache: {e}")
+        return translation
+
+
+    def finish(self, key: str, task: asyncio.Task):
+        self.in_flight.pop(key, None)
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,234 @@
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
+from multiprocessing import shared_memory
+from typing import Optional
+import fitz
+from docx import Document
+from pptx import Presentation
+from src.modules.BaseModule import BaseModule
+
+
+class ParseTimeoutError(Exception):
+    pass
+
+
+class SharedMemoryStream(io.RawIOBase):
+    """Read-only seekable stream over a memoryview, so parsers read shared memory without copying it."""
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self.view = view
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self.view) - self.position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self.view[self.position:self.position + size]
+        self.position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(offset, 0)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self):
+        # Exported views must be released before the shared memory can be closed
+        if not self.closed:
+            self.view.release()
+        super().close()
+
+
+class ParseSource:
+    """Picklable handle to a file for a parser process: a path or a shared memory block."""
+    def __init__(self, path: Optional[str] = None, shm_name: Optional[str] = None, size: int = 0):
+        self.path = path
+        self.shm_name = shm_name
+        self.size = size
+
+    @contextmanager
+    def open(self):
+        if self.path:
+            with open(self.path, "rb") as f:
+                yield f
+        else:
+            shm = shared_memory.SharedMemory(name=self.shm_name)
+            try:
+                with io.BufferedReader(SharedMemoryStream(shm.buf[:self.size])) as stream:
+                    yield stream
+            finally:
+                shm.close()
+
+
+# Parsers accept anything with a `path` attribute and an `open()` context
+# manager yielding a binary stream (FetchedFile or ParseSource).
+
+def parse_docx(source) -> str:
+    with source.open() as stream:
+        document = Document(stream)
+    return "\n".join([p.text for p in document.paragraphs])
+
+
+def parse_pptx(source) -> str:
+    text = ""
+    with source.open() as stream:
+        presentation = Presentation(stream)
+
+    for slide in presentation.slides:
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    text += paragraph.text + "\n"
+
+    return text
+
+
+def parse_pdf(source) -> str:
+    if source.path:
+        pdf = fitz.open(source.path)
+    else:
+        with source.open() as stream:
+            pdf = fitz.open(stream=stream.read(), filetype="pdf")
+
+    row_data = ""
+    with pdf:
+        for page in pdf:
+            row_data += page.get_text() + "\n"
+    return row_data
+
+
+def parse_txt(source) -> str:
+    with source.open() as stream:
+        return stream.read().decode("utf-8")
+
+
+PARSERS = {
+    "pdf": parse_pdf,
+    "docx": parse_docx,
+    "pptx": parse_pptx,
+    "txt": parse_txt
+}
+
+
+def run_parser(file_format: str, source: ParseSource) -> str:
+    return PARSERS[file_format](source)
+
+
+class ParserEngine(BaseModule):
+    """Runs CPU-heavy document parsers in a process pool.
+
+    Each format has its own concurrency limit, and no more parses are submitted
+    than there are pool workers, so every parse has a deadline that starts
+    when a worker is free to take it. A parse that overruns it cannot be cancelled inside a pool worker, so the
+    whole pool is killed and replaced. Parses that were running in the killed
+    pool are retried once on the new one.
+    """
+    def __init__(self):
+        super().__init__()
+        self.timeout = self.settings.PARSER_TIMEOUT_SECONDS
+        self.semaphores = {
+            file_format: asyncio.Semaphore(limit)
+            for file_format, limit in self.settings.PARSER_FORMAT_CONCURRENCY.items()
+        }
+        # Keeps jobs from queueing inside the pool, where waiting would count against the deadline
+        self.workers = asyncio.Semaphore(self.settings.PARSER_NUM_WORKERS)
+        self.generation = 0
+        self.executor = self.create_executor()
+
+
+    def create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.settings.PARSER_NUM_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.settings.PARSER_MAX_TASKS_PER_WORKER
+        )
+
+
+    async def parse(self, file_format: str, fetched_file) -> str:
+        semaphore = self.semaphores.get(file_format)
+        if semaphore is None:
+            return await self.run(file_format, fetched_file)
+        async with semaphore:
+            return await self.run(file_format, fetched_file)
+
+
+    async def run(self, file_format: str, fetched_file) -> str:
+        async with self.share(fetched_file) as source:
+            for attempt in range(2):
+                async with self.workers:
+                    generation = self.generation
+                    loop = asyncio.get_running_loop()
+                    future = loop.run_in_executor(self.executor, run_parser, file_format, source)
+                    try:
+                        return await asyncio.wait_for(future, timeout=self.timeout)
+                    except asyncio.TimeoutError:
+                        self.logger.error(f"Parsing {fetched_file.file_url} exceeded {self.timeout}s, restarting parser pool")
+                        await self.restart(generation)
+                        raise ParseTimeoutError(f"Parsing exceeded {self.timeout} seconds")
+                    except BrokenProcessPool:
+                        # Another file's timeout killed the pool under us
+                        await self.restart(generation)
+                        if attempt:
+                            raise
+
+
+    @asynccontextmanager
+    async def share(self, fetched_file):
+        if fetched_file.path:
+            yield ParseSource(path=fetched_file.path)
+            return
+
+        size = fetched_file.size
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            await asyncio.to_thread(self.copy_to_shared_memory, fetched_file, shm, size)
+            yield ParseSource(shm_name=shm.name, size=size)
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+    @staticmethod
+    def copy_to_shared_memory(fetched_file, shm: shared_memory.SharedMemory, size: int, chunk_size: int = 1 << 20):
+        # Copies straight into the shared block in chunks instead of reading the whole file first
+        with fetched_file.open() as stream, memoryview(shm.buf) as view:
+            offset = 0
+            while offset < size:
+                chunk = stream.read(min(chunk_size, size - offset))
+                if not chunk:
+                    break
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+
+
+    async def restart(self, generation: int):
+        if generation != self.generation:
+            return
+
+        self.generation += 1
+        executor = self.executor
+        self.executor = self.create_executor()
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+    async def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
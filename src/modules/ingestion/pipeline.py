@@ -0,0 +1,44 @@
+import asyncio
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def bounded_stage(source: AsyncIterator[T], maxsize: int) -> AsyncIterator[T]:
+    """Runs `source` in its own task and hands its items over through a bounded queue.
+
+    The producer blocks once `maxsize` items are waiting, which propagates
+    backpressure from the slowest downstream stage back to the first one.
+    Errors raised by the producer are re-raised in the consumer.
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+            await queue.put(_DONE)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await queue.put(_StageError(e))
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,109 @@
+import logging
+from functools import lru_cache
+from typing import List
+from src.modules.BaseModule import BaseModule
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4)
+def get_encoding(encoding_name: str):
+    """Loads a tiktoken encoding once per process.
+
+    The first load may download the BPE file, so the app warms this up at
+    startup rather than on the first request.
+    """
+    if tiktoken is None:
+        logger.warning("tiktoken is not installed, estimating context tokens from character counts")
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        # The encoding file could not be loaded (e.g. no network on first use)
+        logger.warning(f"Could not load tiktoken encoding {encoding_name}, estimating context tokens from character counts: {e}")
+        return None
+
+
+class ContextPacker(BaseModule):
+    """Fits retrieved chunks and history turns into a prompt token budget.
+
+    The fixed segments (instructions, links, courses, headers and the question)
+    are always kept. What is left goes to chunks by descending score (rerank
+    score when the chunks were reranked), then to history turns from the
+    newest back. The first chunk that does not fit is trimmed if enough room
+    remains; everything after it is dropped. Counts use a local tiktoken
+    encoding, or roughly four characters per token without it.
+    """
+    # Tokens for the "[i] " prefix / "User: ... AI: " labels and the line break
+    ITEM_OVERHEAD = 4
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, budget: int):
+        super().__init__()
+        self.budget = budget
+        self.min_trim_tokens = self.settings.CONTEXT_MIN_TRIM_TOKENS
+        self.encoding = get_encoding(self.settings.CONTEXT_TOKEN_ENCODING)
+
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoding is None:
+            return -(-len(text) // self.CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.encoding is None:
+            return text[:max_tokens * self.CHARS_PER_TOKEN]
+        return self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+    def pack(self, fixed_segments: List[str], chunks: List[dict], chat_history: List[dict]) -> dict:
+        """Returns the chunks (best first) and turns (newest first) that fit the budget."""
+        remaining = self.budget - sum(self.count_tokens(segment) for segment in fixed_segments)
+
+        packed_chunks = []
+        trimmed_chunks = 0
+        if all("rerank_score" in chunk for chunk in chunks):
+            ranked = sorted(chunks, key=lambda chunk: chunk["rerank_score"], reverse=True)
+        else:
+            ranked = sorted(chunks, key=lambda chunk: chunk.get("score", 0), reverse=True)
+        for chunk in ranked:
+            cost = self.count_tokens(chunk.get("text", "")) + self.ITEM_OVERHEAD
+            if cost <= remaining:
+                packed_chunks.append(chunk)
+                remaining -= cost
+                continue
+
+            room = remaining - self.ITEM_OVERHEAD
+            if room >= self.min_trim_tokens:
+                packed_chunks.append({**chunk, "text": self.truncate(chunk.get("text", ""), room)})
+                remaining -= room + self.ITEM_OVERHEAD
+                trimmed_chunks = 1
+            break
+
+        packed_history = []
+        for chat in chat_history:
+            cost = self.count_tokens(chat.get("question", "")) + self.count_tokens(chat.get("answer", "")) + self.ITEM_OVERHEAD
+            if cost > remaining:
+                break
+            packed_history.append(chat)
+            remaining -= cost
+
+        dropped_chunks = len(ranked) - len(packed_chunks)
+        dropped_turns = len(chat_history) - len(packed_history)
+        if dropped_chunks or trimmed_chunks or dropped_turns:
+            self.logger.info(
+                f"Context budget {self.budget} tokens: dropped {dropped_chunks} chunks, "
+                f"trimmed {trimmed_chunks} chunks, dropped {dropped_turns} older turns"
+            )
+
+        return {
+            "chunks": packed_chunks,
+            "chat_history": packed_history,
+            "remaining_tokens": remaining
+        }
@@ -18,6 +18,15 @@ class GroqEnums(Enum):
     USER = "user"
     ASSISTANT = "assistant"
     
+class EmbeddingBackendEnum(Enum):
+    GOOGLE = "GOOGLE"
+    OPENAI = "OPENAI"
+    LOCAL = "LOCAL"
+
+class ChunkSizeUnitEnum(Enum):
+    CHARACTERS = "characters"
+    TOKENS = "tokens"
+
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
     QUERY = "query"
\ No newline at end of file
@@ -4,4 +4,8 @@ class LLMInterface(ABC):
 
     @abstractmethod
     async def generate_response(self, messages: list[dict[str, str]], structured_response: bool=False, Response=None):
+        pass
+
+    @abstractmethod
+    async def stream_response(self, messages: list[dict[str, str]]):
         pass
\ No newline at end of file
@@ -15,44 +15,47 @@ class LLMProviderFactory(BaseModule):
 
     async def create(self, provider: str, api_key: str = None, model_id: str = None, max_tokens: int = None, temperature: float = None, base_url: str = None):
 
+        model_id = model_id or self.settings.LLM_MODEL_ID
+        context_budget = self.settings.LLM_CONTEXT_BUDGETS.get(model_id, self.settings.LLM_CONTEXT_BUDGET)
+
         if provider == LLMEnums.AZUREOPENAI.value:
             client = AzureChatOpenAI(
                 api_key = api_key or self.settings.AZURE_OPENAI_API_KEY,
-                azure_deployment = model_id or self.settings.LLM_MODEL_ID,
+                azure_deployment = model_id,
                 max_tokens = max_tokens or self.settings.LLM_MAX_TOKENS,
                 temperature = temperature or self.settings.LLM_TEMPERATURE,
                 azure_endpoint = base_url or self.settings.AZURE_ENDPOINT,
                 openai_api_version = self.settings.AZURE_OPENAI_API_VERSION
             )
-            return BaseProvider(client)
+            return BaseProvider(client, model_id=model_id, context_budget=context_budget)
         
         if provider == LLMEnums.DEEPSEEK.value or provider == LLMEnums.OPENROUTER.value:
             client = ChatOpenAI(
                 api_key = api_key or self.settings.LLM_API_KEY,
-                model = model_id or self.settings.LLM_MODEL_ID,
+                model = model_id,
                 max_tokens = max_tokens or self.settings.LLM_MAX_TOKENS,
                 temperature = temperature or self.settings.LLM_TEMPERATURE,
                 base_url = base_url or self.settings.LLM_API_URL
             )
-            return BaseProvider(client)
+            return BaseProvider(client, model_id=model_id, context_budget=context_budget)
 
         if provider == LLMEnums.GOOGLE.value:
             client = ChatGoogleGenerativeAI(
                 api_key=api_key or self.settings.LLM_API_KEY,
-                model=model_id or self.settings.LLM_MODEL_ID,
+                model=model_id,
                 max_tokens=max_tokens or self.settings.LLM_MAX_TOKENS,
                 temperature=temperature or self.settings.LLM_TEMPERATURE,
             )
-            return BaseProvider(client)
+            return BaseProvider(client, model_id=model_id, context_budget=context_budget)
 
         if provider == LLMEnums.GROQ.value:
             client = ChatGroq(
                 api_key=api_key or self.settings.LLM_API_KEY,
-                model=model_id or self.settings.LLM_MODEL_ID,
+                model=model_id,
                 max_tokens=max_tokens or self.settings.LLM_MAX_TOKENS,
                 temperature=temperature or self.settings.LLM_TEMPERATURE,
             )
-            return BaseProvider(client)
+            return BaseProvider(client, model_id=model_id, context_budget=context_budget)
 
         self.logger.error(f"Invalid provider: {provider}")
         return None
\ No newline at end of file
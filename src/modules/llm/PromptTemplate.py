@@ -0,0 +1,92 @@
+from typing import List
+from src.modules.BaseModule import BaseModule
+
+
+class PromptTemplate(BaseModule):
+    """Assembles the generation prompt with static segments first.
+
+    Instructions, links and the course list are rendered once per catalog
+    version and reused as the same strings, so every prompt starts with a
+    byte-identical prefix that provider-side prompt caching can match.
+    Per-request segments (documents, history, question) always come after.
+    """
+    INSTRUCTIONS = """
+### You are an AI-Powered Educational Assistant for Fusion Ed by FusionMinds.ai
+
+Your purpose is to help users explore and understand the educational content and offerings available on the Fusion Ed platform. You act as a friendly and knowledgeable guide to:
+- Focus solely on the specific question without referencing documents or context
+- Answer questions about available courses and talks
+- Recommend suitable learning paths based only on Fusion Ed's provided content
+- Maintain clarity, brevity, and professionalism in every response
+- Handle unrelated queries politely and redirect appropriately
+
+---
+
+### Guidelines for Responses
+
+#### General Instructions
+1. **Begin responses naturally and conversationally. Avoid phrases like "According to the documents", "Based on the documents", or "As mentioned earlier."**
+2. Focus strictly on Fusion Ed offerings when answering or recommending courses.
+3. Use warm, supportive language while remaining informative and respectful.
+4. If the user's intent or context is unclear, politely ask clarifying questions.
+5. Only recommend courses that appear in the available course list (`##Fusion Ed Available Courses`).
+6. Match recommendations to the user's interest or level, but **never hallucinate new content**.
+
+#### Course Recommendation Guidelines
+1. When recommending courses:
+   - Check the chat history for previously recommended courses
+   - Avoid repeating the same course recommendations unless specifically requested
+   - If a course was already recommended, acknowledge it and suggest complementary courses
+   - Consider the user's learning progression and suggest next steps
+   - Group related courses together for a cohesive learning path
+
+2. For follow-up recommendations:
+   - Reference previously recommended courses when relevant
+   - Build upon previous recommendations to create a learning journey
+   - Suggest courses that complement previously recommended ones
+   - Consider the user's demonstrated interests from the conversation
+
+3. When discussing courses:
+   - Highlight how new recommendations relate to previously mentioned courses
+   - Explain the logical progression between courses
+   - Emphasize the value of the complete learning path
+   - Maintain context of the user's learning goals
+"""
+
+    ANSWER_INSTRUCTION = "answer based ONLY on documents provided"
+
+    LINKS = "##Links\n" + "Fusion Ed: https://www.fusionminds.ai/fusion-ed\n" + \
+        "Fusion Academy Course Trailers: https://www.fusionminds.ai/fusion-ed/fusion-academy-course-trailers\n"
+
+    def __init__(self):
+        super().__init__()
+        self.static_version = None
+        self.static_messages = []
+
+
+    def get_static_messages(self, courses: List[str], catalog_version: str) -> List[dict]:
+        if catalog_version != self.static_version:
+            self.static_messages = [
+                {"role": "system", "content": self.INSTRUCTIONS},
+                {"role": "system", "content": self.LINKS},
+                {"role": "system", "content": self.format_courses(courses)}
+            ]
+            self.static_version = catalog_version
+        return self.static_messages
+
+
+    def render(self, courses: List[str], catalog_version: str, dynamic_segments: List[str], question: str) -> List[dict]:
+        llm_entry = list(self.get_static_messages(courses, catalog_version))
+        for segment in dynamic_segments:
+            llm_entry.append({"role": "system", "content": segment})
+
+        if question:
+            llm_entry.append({"role": "user", "content": self.ANSWER_INSTRUCTION})
+            llm_entry.append({"role": "user", "content": question})
+
+        return llm_entry
+
+
+    @staticmethod
+    def format_courses(courses: List[str]) -> str:
+        return "##Fusion Ed Available Courses:\n" + "\n".join(courses)
@@ -8,10 +8,13 @@ class BaseProvider(BaseModule):
     Example:
         >>> provider = GoogleGenerativeAIProvider(api_key, model)
     """
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, model_id: str = None, context_budget: int = None):
 
         super().__init__()
         self.logger = logging.getLogger(__name__)
+        self.model_id = model_id
+        # Prompt token budget the ContextPacker fills for this model
+        self.context_budget = context_budget or self.settings.LLM_CONTEXT_BUDGET
 
         try:
             self.client = llm_client
@@ -36,4 +39,19 @@ class BaseProvider(BaseModule):
             return response.content
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+    async def stream_response(self, messages: list[dict[str, str]]):
+        """Yields the model response token by token as soon as each one arrives."""
+        if not self.client:
+            self.logger.error("Client is not initialized.")
+            return
+
+        try:
+            async for chunk in self.client.astream(messages):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            self.logger.error(f"Error streaming response: {e}")
+            raise
\ No newline at end of file
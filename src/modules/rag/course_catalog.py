@@ -0,0 +1,73 @@
+import asyncio
+import hashlib
+import os
+from typing import List, Set
+from src.modules.BaseModule import BaseModule
+
+
+class CourseCatalog(BaseModule):
+    """In-memory list of courses built from the indexed file names.
+
+    Loaded from a facet on the `file_name` payload index at startup, extended
+    as ingestion finishes files and reloaded periodically so workers that did
+    not run the ingestion catch up.
+    `version` changes whenever the list does and is part of the answer cache key.
+    """
+    def __init__(self, vector_store):
+        super().__init__()
+        self.vector_store = vector_store
+        self.file_names: Set[str] = set()
+        self.courses: List[str] = []
+        self.version = self.make_version(self.courses)
+        self.refresher = None
+
+
+    async def start(self):
+        await self.load()
+        if self.settings.COURSE_CATALOG_REFRESH_SECONDS:
+            self.refresher = asyncio.create_task(self.refresh())
+
+
+    async def stop(self):
+        if self.refresher:
+            self.refresher.cancel()
+            await asyncio.gather(self.refresher, return_exceptions=True)
+            self.refresher = None
+
+
+    async def load(self):
+        self.file_names = await self.vector_store.get_file_names(self.settings.COURSE_CATALOG_MAX_FILES)
+        self.rebuild()
+        self.logger.info(f"Loaded course catalog with {len(self.courses)} courses")
+
+
+    async def refresh(self):
+        while True:
+            await asyncio.sleep(self.settings.COURSE_CATALOG_REFRESH_SECONDS)
+            try:
+                await self.load()
+            except Exception as e:
+                self.logger.error(f"Error refreshing course catalog: {e}")
+
+
+    async def add(self, file_name: str) -> bool:
+        if file_name in self.file_names:
+            return False
+        self.file_names.add(file_name)
+        self.rebuild()
+        return True
+
+
+    def get_courses(self) -> List[str]:
+        return self.courses
+
+
+    def rebuild(self):
+        # Course titles are the uploaded file names without their extension
+        self.courses = sorted({os.path.splitext(file_name)[0] for file_name in self.file_names})
+        self.version = self.make_version(self.courses)
+
+
+    @staticmethod
+    def make_version(courses: List[str]) -> str:
+        return hashlib.sha1("\n".join(courses).encode("utf-8")).hexdigest()
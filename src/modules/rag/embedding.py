@@ -1,23 +1,67 @@
 from typing import List
+import numpy as np
 from src.modules.BaseModule import BaseModule
+from src.modules.cache.embedding_cache import EmbeddingCache
+from src.modules.llm.LLMEnums import DocumentTypeEnum, EmbeddingBackendEnum
+from src.modules.rag.local_embedding import LocalEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_openai import OpenAIEmbeddings
 
 class Embedding(BaseModule):
     def __init__(self):
         super().__init__()
-        # self.embedding_model = OpenAIEmbeddings(
-        #     model=self.settings.EMBEDDING_MODEL,
-        #     api_key=self.settings.EMBEDDING_API_KEY,
-        # )
-        self.embedding_model = GoogleGenerativeAIEmbeddings(
-            model=self.settings.EMBEDDING_MODEL,
-            google_api_key=self.settings.EMBEDDING_API_KEY,
-        )
+        backend = self.settings.EMBEDDING_BACKEND
+
+        if backend == EmbeddingBackendEnum.LOCAL.value:
+            self.embedding_model = LocalEmbeddings()
+        elif backend == EmbeddingBackendEnum.OPENAI.value:
+            self.embedding_model = OpenAIEmbeddings(
+                model=self.settings.EMBEDDING_MODEL,
+                api_key=self.settings.EMBEDDING_API_KEY,
+            )
+        else:
+            self.embedding_model = GoogleGenerativeAIEmbeddings(
+                model=self.settings.EMBEDDING_MODEL,
+                google_api_key=self.settings.EMBEDDING_API_KEY,
+            )
+
+        cache_name = f"{backend}:{self.settings.EMBEDDING_MODEL}"
+        self.cache = EmbeddingCache.get_instance(cache_name) if self.settings.EMBEDDING_CACHE_ENABLED else None
 
     
     async def embed_documents(self, documents: List[str]) -> List[List[float]]:
-        return await self.embedding_model.aembed_documents(documents)
+        return await self.embed_with_cache(documents, DocumentTypeEnum.DOCUMENT.value)
 
     async def embed_query(self, query: str):
-        return await self.embedding_model.aembed_query(query)
\ No newline at end of file
+        embeddings = await self.embed_with_cache([query], DocumentTypeEnum.QUERY.value)
+        return embeddings[0]
+
+    async def embed_with_cache(self, texts: List[str], document_type: str) -> List[List[float]]:
+        if not self.cache:
+            return await self.embed_remote(texts, document_type)
+
+        keys = [self.cache.make_key(text, document_type) for text in texts]
+        embeddings = await self.cache.get_many(keys)
+
+        # Only unique misses go to the embedding API
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings and key not in misses:
+                misses[key] = text
+
+        if misses:
+            new_embeddings = await self.embed_remote(list(misses.values()), document_type)
+            new_embeddings = dict(zip(misses.keys(), new_embeddings))
+            await self.cache.put_many(new_embeddings)
+            embeddings.update(new_embeddings)
+
+        # The cache holds float32 arrays; callers get plain lists
+        return [
+            embeddings[key].tolist() if isinstance(embeddings[key], np.ndarray) else embeddings[key]
+            for key in keys
+        ]
+
+    async def embed_remote(self, texts: List[str], document_type: str) -> List[List[float]]:
+        if document_type == DocumentTypeEnum.QUERY.value:
+            return [await self.embedding_model.aembed_query(text) for text in texts]
+        return await self.embedding_model.aembed_documents(texts)
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from src.modules.BaseModule import BaseModule
+
+# Loaded once per worker process by `init_worker`
+_model = None
+
+
+def init_worker(model_name: str, num_threads: int, embedding_size: int):
+    global _model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(num_threads)
+    _model = SentenceTransformer(model_name, device="cpu")
+
+    native_size = _model.get_sentence_embedding_dimension()
+    if native_size < embedding_size:
+        raise ValueError(f"Model {model_name} produces {native_size}-d vectors, EMBEDDING_SIZE is {embedding_size}")
+    _model.truncate_dim = embedding_size
+
+
+def encode_batch(texts: List[str], batch_size: int, is_query: bool) -> List[List[float]]:
+    prompt_name = "query" if is_query and "query" in _model.prompts else None
+    embeddings = _model.encode(
+        texts,
+        batch_size=batch_size,
+        prompt_name=prompt_name,
+        normalize_embeddings=True,
+        convert_to_numpy=True
+    )
+    return embeddings.tolist()
+
+
+class LocalEmbeddings(BaseModule):
+    """sentence-transformers embeddings computed on CPU in a worker process pool.
+
+    Exposes the same `aembed_documents` / `aembed_query` coroutines as the
+    LangChain embedding clients so `Embedding` can treat it as one of them.
+    """
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    def __init__(self):
+        super().__init__()
+        self.batch_size = self.settings.EMBEDDING_BATCH_SIZE
+
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            settings = cls().settings
+            cls._executor = ProcessPoolExecutor(
+                max_workers=settings.EMBEDDING_NUM_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(settings.EMBEDDING_MODEL, settings.EMBEDDING_NUM_THREADS, settings.EMBEDDING_SIZE)
+            )
+        return cls._executor
+
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        # One task per batch so several workers can share a large upload
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, encode_batch, batch, self.batch_size, False)
+            for batch in batches
+        ])
+        return [embedding for batch in results for embedding in batch]
+
+
+    async def aembed_query(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(self.get_executor(), encode_batch, [text], 1, True)
+        return embeddings[0]
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from src.helpers.metrics import get_counters
+from src.modules.BaseModule import BaseModule
+from src.modules.cache.ttl_cache import TTLCache
+
+# Loaded once per worker process by `init_worker`
+_model = None
+
+
+def init_worker(model_name: str, num_threads: int, max_length: int):
+    global _model
+    import torch
+    from sentence_transformers import CrossEncoder
+
+    torch.set_num_threads(num_threads)
+    _model = CrossEncoder(model_name, device="cpu", max_length=max_length)
+
+
+def score_pairs(pairs: List[Tuple[str, str]], batch_size: int) -> List[float]:
+    scores = _model.predict(pairs, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return scores.reshape(len(pairs), -1)[:, 0].tolist()
+
+
+class Reranker(BaseModule):
+    """Reorders retrieved chunks with a sentence-transformers cross-encoder on CPU.
+
+    Scoring runs in a worker process pool so the model never blocks the event
+    loop. Scores are cached by (query hash, point id, content hash), so
+    regenerated answers and overlapping retrievals only score the pairs they
+    have not seen, and re-indexed chunks are scored again. Cross-encoder logits
+    are unbounded, so they go to `rerank_score` and `score` stays the retrieval
+    cosine that the rest of the pipeline reads.
+    """
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    def __init__(self):
+        super().__init__()
+        self.top_n = self.settings.RERANKER_TOP_N
+        self.batch_size = self.settings.RERANKER_BATCH_SIZE
+        self.scores = TTLCache(self.settings.RERANKER_CACHE_ENTRIES, ttl=self.settings.RERANKER_CACHE_TTL_SECONDS)
+        self.metrics = get_counters("reranker")
+
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            settings = cls().settings
+            cls._executor = ProcessPoolExecutor(
+                max_workers=settings.RERANKER_NUM_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(settings.RERANKER_MODEL, settings.RERANKER_NUM_THREADS, settings.RERANKER_MAX_LENGTH)
+            )
+        return cls._executor
+
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+
+    async def rerank(self, query: str, chunks: List[dict], top_n: Optional[int] = None) -> List[dict]:
+        top_n = top_n or self.top_n
+        if not chunks:
+            return []
+
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        scores = {}
+        misses = []
+        for chunk in chunks:
+            score = self.scores.get(self.make_key(query_hash, chunk))
+            if score is None:
+                misses.append(chunk)
+            else:
+                scores[chunk["id"]] = score
+        self.metrics.incr("hits", len(chunks) - len(misses))
+        self.metrics.incr("misses", len(misses))
+
+        if misses:
+            new_scores = await self.score(query, [chunk["text"] for chunk in misses])
+            for chunk, score in zip(misses, new_scores):
+                self.scores.set(self.make_key(query_hash, chunk), score)
+                scores[chunk["id"]] = score
+
+        reranked = [{**chunk, "rerank_score": scores[chunk["id"]]} for chunk in chunks]
+        reranked.sort(key=lambda chunk: chunk["rerank_score"], reverse=True)
+        return reranked[:top_n]
+
+
+    @staticmethod
+    def make_key(query_hash: str, chunk: dict) -> Tuple[str, str, str]:
+        # Point ids survive re-ingestion, so the content decides whether a score is still valid
+        content_hash = (chunk.get("metadata") or {}).get("content_hash")
+        if not content_hash:
+            content_hash = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
+        return query_hash, chunk["id"], content_hash
+
+
+    async def score(self, query: str, texts: List[str]) -> List[float]:
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, score_pairs, [(query, text) for text in batch], self.batch_size)
+            for batch in batches
+        ])
+        return [score for batch in results for score in batch]
@@ -0,0 +1,54 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List
+from src.modules.BaseModule import BaseModule
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i if in into is it its
+me my of on or our so than that the their them then there these they this those to was we were what when
+where which who why will with would you your
+""".split())
+
+
+class BM25Encoder(BaseModule):
+    """Local BM25 term weights as sparse vectors.
+
+    Terms are hashed into a 31-bit index space, so no vocabulary has to be
+    fitted or shipped. Documents carry the BM25 term-frequency part; the IDF
+    part is applied by Qdrant at query time (Modifier.IDF on the sparse
+    vector), so it always matches the current collection. Query terms weigh 1.
+    """
+    def __init__(self):
+        super().__init__()
+        self.k1 = self.settings.SPARSE_BM25_K1
+        self.b = self.settings.SPARSE_BM25_B
+        self.avg_doc_length = self.settings.SPARSE_AVG_DOC_LENGTH
+
+
+    def tokenize(self, text: str) -> List[str]:
+        return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+    @staticmethod
+    def term_index(token: str) -> int:
+        return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+
+    def encode_document(self, text: str) -> Dict[str, list]:
+        tokens = self.tokenize(text)
+        length_norm = 1 - self.b + self.b * len(tokens) / self.avg_doc_length
+
+        weights = {}
+        for token, tf in Counter(tokens).items():
+            index = self.term_index(token)
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return {"indices": list(weights), "values": list(weights.values())}
+
+
+    def encode_query(self, text: str) -> Dict[str, list]:
+        indices = sorted({self.term_index(token) for token in self.tokenize(text)})
+        return {"indices": indices, "values": [1.0] * len(indices)}
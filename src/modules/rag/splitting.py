@@ -1,16 +1,33 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from langchain.schema import Document
 from src.modules.BaseModule import BaseModule
+from src.modules.llm.LLMEnums import ChunkSizeUnitEnum
 
 class RecursiveSplitter(BaseModule):
     def __init__(self):
         super().__init__()
 
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.settings.CHUNK_SIZE,
-            chunk_overlap=self.settings.CHUNK_OVERLAP
-        )
+        if self.settings.CHUNK_SIZE_UNIT == ChunkSizeUnitEnum.TOKENS.value:
+            # CHUNK_SIZE and CHUNK_OVERLAP are counted in tokens of the given encoding
+            self.text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+                encoding_name=self.settings.CHUNK_TOKEN_ENCODING,
+                chunk_size=self.settings.CHUNK_SIZE,
+                chunk_overlap=self.settings.CHUNK_OVERLAP
+            )
+        else:
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.settings.CHUNK_SIZE,
+                chunk_overlap=self.settings.CHUNK_OVERLAP
+            )
 
     async def split_documents(self, documents: List[str], metadatas: Optional[List[dict]] = None) -> List[Document]:
-        return self.text_splitter.create_documents(documents, metadatas)
\ No newline at end of file
+        return self.text_splitter.create_documents(documents, metadatas)
+
+    async def iter_splits(self, documents: List[str], metadatas: Optional[List[dict]] = None) -> AsyncIterator[Tuple[int, int, Document]]:
+        """Yields (doc_index, chunk_order, chunk) one document at a time, chunk_order starting at 1."""
+        for doc_index, text in enumerate(documents):
+            metadata = metadatas[doc_index] if metadatas else {}
+            for chunk_order, chunk_text in enumerate(self.text_splitter.split_text(text), start=1):
+                chunk = Document(page_content=chunk_text, metadata={**metadata, "chunk_order": chunk_order})
+                yield doc_index, chunk_order, chunk
@@ -0,0 +1,87 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+import backoff
+from src.modules.BaseModule import BaseModule
+
+
+class UpsertEngine(BaseModule):
+    """Writes embedded chunks to the vector store in byte-sized batches.
+
+    Batches are capped by an estimate of their request size and point count,
+    up to UPSERT_CONCURRENCY of them are in flight at once, and each batch is
+    retried with exponential backoff before its chunks are reported as failed.
+    """
+    def __init__(self, vector_store):
+        super().__init__()
+        self.vector_store = vector_store
+        self.max_batch_bytes = self.settings.UPSERT_MAX_BATCH_BYTES
+        self.max_batch_points = self.settings.UPSERT_MAX_BATCH_POINTS
+        self.max_tries = self.settings.UPSERT_MAX_TRIES
+        self.backoff_factor = self.settings.UPSERT_BACKOFF_SECONDS
+        self.wait = self.settings.UPSERT_WAIT
+        self.semaphore = asyncio.Semaphore(self.settings.UPSERT_CONCURRENCY)
+
+
+    async def upsert(self, documents_with_embeddings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        batches = await self.make_batches(documents_with_embeddings)
+        results = await asyncio.gather(*[self.upsert_batch(batch) for batch in batches])
+
+        failed = [
+            {
+                "file_id": chunk["metadata"].get("file_id"),
+                "chunk_order": chunk["metadata"].get("chunk_order")
+            }
+            for batch, success in zip(batches, results) if not success
+            for chunk in batch
+        ]
+        return {
+            "upserted": len(documents_with_embeddings) - len(failed),
+            "failed": failed
+        }
+
+
+    async def make_batches(self, documents_with_embeddings: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        batches = []
+        batch = []
+        batch_bytes = 0
+        for chunk in documents_with_embeddings:
+            chunk_bytes = await self.estimate_size(chunk)
+            if batch and (batch_bytes + chunk_bytes > self.max_batch_bytes or len(batch) >= self.max_batch_points):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(chunk)
+            batch_bytes += chunk_bytes
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+
+    async def estimate_size(self, chunk: Dict[str, Any]) -> int:
+        # Vectors travel as JSON floats (~20 bytes each); text is also stored in the payload
+        # and, for hybrid collections, sent again as ~30 bytes per distinct word of sparse vector
+        text_bytes = len(chunk["text"].encode("utf-8"))
+        sparse_bytes = 5 * text_bytes if getattr(self.vector_store, "hybrid", False) else 0
+        return (
+            len(chunk["embedding"]) * 20
+            + 2 * text_bytes
+            + sparse_bytes
+            + len(json.dumps(chunk["metadata"], default=str))
+        )
+
+
+    async def upsert_batch(self, batch: List[Dict[str, Any]]) -> bool:
+
+        @backoff.on_exception(backoff.expo, Exception, max_tries=self.max_tries, factor=self.backoff_factor, logger=None)
+        async def send():
+            await self.vector_store.save_chunks(batch, wait=self.wait)
+
+        async with self.semaphore:
+            try:
+                await send()
+                return True
+            except Exception as e:
+                self.logger.error(f"Failed to upsert batch of {len(batch)} chunks after {self.max_tries} attempts: {e}")
+                return False
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from src.routes.schemas.base import HealthCheckResponse
 from src.helpers.config import Settings, get_settings
+from src.helpers.metrics import snapshot_all
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,3 +16,8 @@ async def health_check(settings: Settings = Depends(get_settings)):
         status="healthy",
         version=settings.APP_VERSION
     )
+
+
+@base_router.get("/metrics")
+async def metrics():
+    return snapshot_all()
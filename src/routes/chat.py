@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.responses import StreamingResponse
 from src.controllers.ChatController import ChatController
 from src.controllers.QueryTranslationController import QueryTranslationController
 from src.helpers.config import Settings, get_settings
 from src.routes.schemas.chat import ChatHistory, ChatHistoryRequest, ChatHistoryResponse, ChatRequest, ChatResponse
 from src.modules.llm.LLMProviderFactory import LLMProviderFactory
 import logging
+import json
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +20,12 @@ async def upload_file(request: Request,
                       chat_request: ChatRequest,
                       settings: Settings = Depends(get_settings)):
 
-    query_translator = QueryTranslationController(llm=request.app.llm)  
-    chat_controller = ChatController(llm=request.app.llm, chat_history_model=request.app.chat_history_model, vector_store=request.app.vector_store, query_translator=query_translator)
-    response = await chat_controller.generate_response(chat_request.question, chat_request.user_id, chat_request.chat_id)
+    query_translator = QueryTranslationController(llm=request.app.llm, translation_cache=request.app.translation_cache)  
+    chat_controller = ChatController(llm=request.app.llm, chat_history_model=request.app.chat_history_model, vector_store=request.app.vector_store, query_translator=query_translator, answer_cache=request.app.answer_cache,
+                                     prompt_template=request.app.prompt_template, course_catalog=request.app.course_catalog,
+                                     reranker=request.app.reranker)
+    response = await chat_controller.generate_response(chat_request.question, chat_request.user_id, chat_request.chat_id,
+                                                       course_id=chat_request.course_id, file_id=chat_request.file_id)
     logger.info(f"Response: {response}")
 
     return ChatResponse(
@@ -28,10 +33,39 @@ async def upload_file(request: Request,
     )
 
 
-async def answer(question: str, user_id: str, chat_id: str, llm, chat_history_model, vector_store):
+@chat_router.post("/answer/stream")
+async def stream_answer(request: Request,
+                        chat_request: ChatRequest,
+                        settings: Settings = Depends(get_settings)):
+
+    query_translator = QueryTranslationController(llm=request.app.llm, translation_cache=request.app.translation_cache)
+    chat_controller = ChatController(llm=request.app.llm, chat_history_model=request.app.chat_history_model, vector_store=request.app.vector_store, query_translator=query_translator, answer_cache=request.app.answer_cache,
+                                     prompt_template=request.app.prompt_template, course_catalog=request.app.course_catalog,
+                                     reranker=request.app.reranker)
+
+    async def event_stream():
+        try:
+            async for token in chat_controller.stream_response(chat_request.question, chat_request.user_id, chat_request.chat_id,
+                                                               course_id=chat_request.course_id, file_id=chat_request.file_id):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def answer(question: str, user_id: str, chat_id: str, llm, chat_history_model, vector_store, answer_cache=None,
+                 prompt_template=None, course_catalog=None, translation_cache=None):
     
-    query_translator = QueryTranslationController(llm=llm)
-    chat_controller = ChatController(llm=llm, chat_history_model=chat_history_model, vector_store=vector_store, query_translator=query_translator)
+    query_translator = QueryTranslationController(llm=llm, translation_cache=translation_cache)
+    chat_controller = ChatController(llm=llm, chat_history_model=chat_history_model, vector_store=vector_store, query_translator=query_translator, answer_cache=answer_cache,
+                                     prompt_template=prompt_template, course_catalog=course_catalog)
     response = await chat_controller.generate_response(question, user_id, chat_id)
     logger.info(f"Response: {response}")
 
@@ -42,17 +76,21 @@ async def answer(question: str, user_id: str, chat_id: str, llm, chat_history_mo
 
 @chat_router.get("/history",response_model=ChatHistoryResponse)
 async def get_chat_history(request: Request,
-                          chat_request: ChatHistoryRequest,
+                          chat_request: ChatHistoryRequest = Depends(),
                           settings: Settings = Depends(get_settings)):
     
     chat_controller = ChatController(llm=request.app.llm, chat_history_model=request.app.chat_history_model, vector_store=request.app.vector_store)
-    response = await chat_controller.get_chat_history(chat_request.user_id)
+    try:
+        response = await chat_controller.get_chat_history_page(chat_request.user_id, chat_request.chat_id, chat_request.limit, chat_request.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     return ChatHistoryResponse(
         history=[ChatHistory(
             query=chat.get("question", ""),
             response=chat.get("answer", ""),
-            timestamp=chat.get("timestamp", "")
-        ) for chat in response]
+            timestamp=chat["metadata"]["timestamp"].isoformat()
+        ) for chat in response["chat_history"]],
+        next_cursor=response["next_cursor"]
     )
 
@@ -1,11 +1,13 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatRequest(BaseModel):
     user_id: str
     chat_id: str
     question: str
+    course_id: Optional[str] = None
+    file_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     answer: str
@@ -13,8 +15,8 @@ class ChatResponse(BaseModel):
 class ChatHistoryRequest(BaseModel):
     user_id: str
     chat_id: str
-    timestamp: Optional[str] = None
-    limit: Optional[int] = 10
+    cursor: Optional[str] = None
+    limit: int = Field(10, ge=1, le=100)
 
 class ChatHistory(BaseModel):
     query: Optional[str] = None
@@ -23,5 +25,6 @@ class ChatHistory(BaseModel):
 
 class ChatHistoryResponse(BaseModel):
     history: Optional[List[Optional[ChatHistory]]] = None
+    next_cursor: Optional[str] = None
 
 
@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -18,3 +19,27 @@ class FileResponse(BaseModel):
     error_messages: List[str]
     status_code: int
 
+
+class FileProgressResponse(BaseModel):
+    file_id: str
+    file_url: str
+    file_name: str
+    course_id: str
+    status: str
+    message: Optional[str] = None
+    chunks: int = 0
+    unchanged_chunks: int = 0
+    failed_chunks: int = 0
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    status: str
+    total_files: int
+    completed_files: int
+    failed_files: int
+    pending_files: int
+    files: List[FileProgressResponse]
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -62,7 +62,7 @@ def upload_file(file):
             json=file_request
         )
         
-        if response.status_code == 200:
+        if response.status_code in (200, 202):
             st.success(f"Successfully uploaded {file.name}")
             st.session_state.uploaded_files.append(file.name)
         else:
@@ -0,0 +1,13 @@
+import pytest
+from src.helpers.config import Settings
+
+
+@pytest.fixture(autouse=True)
+def settings_env(monkeypatch, tmp_path):
+    # Required settings get placeholder values; tests override what they exercise
+    for name, field in Settings.model_fields.items():
+        if field.is_required():
+            monkeypatch.setenv(name, "1")
+    monkeypatch.setenv("EMBEDDING_SIZE", "8")
+    monkeypatch.setenv("EMBEDDING_CACHE_DIR", str(tmp_path / "embedding_cache"))
+    return monkeypatch
@@ -0,0 +1,139 @@
+import asyncio
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+from src.models.ChatHistoryWriteBuffer import ChatHistoryWriteBuffer
+
+
+class FakeCollection:
+    def __init__(self, available=True):
+        self.available = available
+        self.documents = {}
+        self.calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if not self.available:
+            raise AutoReconnect("mongo unavailable")
+        for document in documents:
+            self.documents[document["_id"]] = document
+
+
+def make_document(question="q"):
+    return {"_id": ObjectId(), "user_id": "u", "chat_id": "c", "question": question}
+
+
+def make_buffer(collection, tmp_path, flush_size=100, flush_interval=60.0):
+    return ChatHistoryWriteBuffer(collection, flush_size, flush_interval, str(tmp_path / "journal.jsonl"))
+
+
+def test_flushes_when_batch_is_full(tmp_path):
+    async def run():
+        collection = FakeCollection()
+        buffer = make_buffer(collection, tmp_path, flush_size=2)
+        await buffer.start()
+        await buffer.add(make_document())
+        await asyncio.sleep(0.05)
+        assert not collection.documents
+
+        await buffer.add(make_document())
+        await asyncio.sleep(0.05)
+        assert len(collection.documents) == 2
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_flushes_on_interval(tmp_path):
+    async def run():
+        collection = FakeCollection()
+        buffer = make_buffer(collection, tmp_path, flush_interval=0.05)
+        await buffer.start()
+        document = make_document()
+        await buffer.add(document)
+        assert buffer.pending_for("u", "c") == [document]
+
+        await asyncio.sleep(0.2)
+        assert list(collection.documents) == [document["_id"]]
+        assert buffer.pending_for("u", "c") == []
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_close_drains_pending_writes(tmp_path):
+    async def run():
+        collection = FakeCollection()
+        buffer = make_buffer(collection, tmp_path)
+        await buffer.start()
+        for _ in range(3):
+            await buffer.add(make_document())
+        await buffer.close()
+        assert len(collection.documents) == 3
+
+    asyncio.run(run())
+
+
+def test_failed_flush_is_replayed_from_journal_after_restart(tmp_path):
+    async def run():
+        down = FakeCollection(available=False)
+        buffer = make_buffer(down, tmp_path)
+        await buffer.start()
+        documents = [make_document("first"), make_document("second")]
+        for document in documents:
+            await buffer.add(document)
+        await buffer.close()
+        assert (tmp_path / "journal.jsonl").read_text().count("\n") == 2
+
+        # A new process starts with Mongo back up
+        collection = FakeCollection()
+        buffer = make_buffer(collection, tmp_path)
+        await buffer.start()
+        assert set(collection.documents) == {document["_id"] for document in documents}
+        assert (tmp_path / "journal.jsonl").read_text() == ""
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_corrupt_journal_lines_are_set_aside(tmp_path):
+    async def run():
+        journal = tmp_path / "journal.jsonl"
+        journal.write_text('{"_id": {"$oid": "65a000000000000000000001"}, "user_id": "u", "chat_id": "c"}\nnot json\n')
+
+        collection = FakeCollection()
+        buffer = make_buffer(collection, tmp_path)
+        await buffer.start()
+
+        assert list(collection.documents) == [ObjectId("65a000000000000000000001")]
+        assert journal.read_text() == ""
+        assert (tmp_path / "journal.jsonl.rejected").read_text() == "not json\n"
+        await buffer.close()
+
+    asyncio.run(run())
+
+
+def test_flusher_survives_unexpected_errors(tmp_path):
+    class BrokenOnce(FakeCollection):
+        async def insert_many(self, documents, ordered=True):
+            if self.calls == 0:
+                self.calls += 1
+                raise ValueError("cannot encode document")
+            await super().insert_many(documents, ordered)
+
+    async def run():
+        collection = BrokenOnce()
+        buffer = make_buffer(collection, tmp_path, flush_interval=0.05)
+        await buffer.start()
+        first = make_document("first")
+        await buffer.add(first)
+        await asyncio.sleep(0.2)
+        assert not buffer.flusher.done()
+
+        second = make_document("second")
+        await buffer.add(second)
+        await asyncio.sleep(0.2)
+        # The failed batch went to the journal and was replayed with the next flush
+        assert set(collection.documents) == {first["_id"], second["_id"]}
+        await buffer.close()
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from tempfile import SpooledTemporaryFile
+import pytest
+from src.modules.ingestion import parsing
+from src.modules.ingestion.fetching import FetchedFile
+from src.modules.ingestion.parsing import ParserEngine, ParseTimeoutError
+
+
+def fake_parser(file_format: str, source) -> str:
+    # Runs in the pool worker; the format name says how to behave
+    if file_format.startswith("sleep"):
+        time.sleep(float(file_format.split(":")[1]))
+    elif file_format == "crash":
+        os._exit(1)
+    return parsing.run_parser("txt", source)
+
+
+def make_file(tmp_path, text="hello"):
+    path = tmp_path / "file.txt"
+    path.write_text(text)
+    return FetchedFile(str(path), path=str(path), size=len(text))
+
+
+def make_buffered_file(text):
+    data = text.encode("utf-8")
+    buffer = SpooledTemporaryFile(max_size=1024 * 1024)
+    buffer.write(data)
+    return FetchedFile("https://example.com/file.txt", buffer=buffer, size=len(data))
+
+
+@pytest.fixture
+def make_engine(settings_env):
+    engines = []
+
+    def make(workers=2, timeout=30, fake=True):
+        settings_env.setenv("PARSER_NUM_WORKERS", str(workers))
+        settings_env.setenv("PARSER_TIMEOUT_SECONDS", str(timeout))
+        settings_env.setenv("PARSER_FORMAT_CONCURRENCY", "{}")
+        if fake:
+            settings_env.setattr(parsing, "run_parser", fake_parser)
+        engine = ParserEngine()
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        asyncio.run(engine.shutdown())
+
+
+def test_parses_files_from_disk_and_shared_memory(make_engine, tmp_path):
+    async def run(engine):
+        assert await engine.parse("txt", make_file(tmp_path, "on disk")) == "on disk"
+        assert await engine.parse("txt", make_buffered_file("in memory " * 1000)) == "in memory " * 1000
+
+    asyncio.run(run(make_engine(fake=False)))
+
+
+def test_timeout_restarts_the_pool(make_engine, tmp_path):
+    async def run(engine):
+        with pytest.raises(ParseTimeoutError):
+            await engine.parse("sleep:60", make_file(tmp_path))
+        assert engine.generation == 1
+
+        engine.timeout = 30
+        assert await engine.parse("txt", make_file(tmp_path)) == "hello"
+
+    asyncio.run(run(make_engine(timeout=3)))
+
+
+def test_queued_parses_do_not_time_out(make_engine, tmp_path):
+    # Three 1.5s parses on one worker take longer than the deadline in total,
+    # but each one only waits for its own turn before its deadline starts
+    async def run(engine):
+        results = await asyncio.gather(*[engine.parse("sleep:1.5", make_file(tmp_path)) for _ in range(3)])
+        assert results == ["hello"] * 3
+        assert engine.generation == 0
+
+    asyncio.run(run(make_engine(workers=1, timeout=4)))
+
+
+def test_worker_crash_is_retried_once(make_engine, tmp_path):
+    async def run(engine):
+        with pytest.raises(BrokenProcessPool):
+            await engine.parse("crash", make_file(tmp_path))
+        assert engine.generation == 2
+
+        # The replacement pool keeps working
+        assert await engine.parse("txt", make_file(tmp_path)) == "hello"
+
+    asyncio.run(run(make_engine()))
+
+
+def test_parse_interrupted_by_another_crash_is_retried(make_engine, tmp_path):
+    async def run(engine):
+        healthy = asyncio.create_task(engine.parse("sleep:2", make_file(tmp_path)))
+        await asyncio.sleep(1)
+        with pytest.raises(BrokenProcessPool):
+            await engine.parse("crash", make_file(tmp_path))
+        assert await healthy == "hello"
+
+    asyncio.run(run(make_engine()))
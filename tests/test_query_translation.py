@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from src.controllers.QueryTranslationController import QueryTranslationController
+
+CHAT_HISTORY = [{"question": "What is climate change?", "answer": "A long-term shift in temperatures."}]
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setenv("QUERY_TRANSLATION_GATE_ENABLED", "true")
+    monkeypatch.setenv("QUERY_TRANSLATION_GATE_EMBEDDING", "false")
+    return QueryTranslationController(llm=None)
+
+
+@pytest.mark.parametrize("question", [
+    "What courses cover biodiversity?",
+    "What courses are there on climate change and carbon markets?",
+    "Which course explains the GHG Protocol?",
+    "What other courses cover ESG reporting?",
+    "Are there more courses on sustainable finance?",
+    "What courses start this year?",
+    "List the courses that cover carbon accounting",
+])
+def test_self_contained_questions_skip_translation(controller, question):
+    assert asyncio.run(controller.is_self_contained(question, CHAT_HISTORY))
+
+
+@pytest.mark.parametrize("question", [
+    "What are its effects?",
+    "How does it work?",
+    "Which of these courses is for beginners?",
+    "Can you explain that?",
+    "Tell me more",
+    "And the second one?",
+    "What about carbon credits?",
+    "Summarize the above in three points",
+    "Biodiversity?",
+])
+def test_follow_up_questions_are_translated(controller, question):
+    assert not asyncio.run(controller.is_self_contained(question, CHAT_HISTORY))
+
+
+def test_gate_disabled_always_translates(controller, monkeypatch):
+    monkeypatch.setattr(controller.settings, "QUERY_TRANSLATION_GATE_ENABLED", False)
+    assert not asyncio.run(controller.is_self_contained("What courses cover biodiversity?", CHAT_HISTORY))
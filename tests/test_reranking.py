@@ -0,0 +1,39 @@
+import asyncio
+from src.modules.rag.reranking import Reranker
+
+
+class FakeReranker(Reranker):
+    """Scores by text length instead of running the cross-encoder."""
+    def __init__(self):
+        super().__init__()
+        self.scored = []
+
+    async def score(self, query, texts):
+        self.scored.extend(texts)
+        return [float(len(text)) - 10 for text in texts]
+
+
+def make_chunk(point_id, text, score):
+    return {"id": point_id, "text": text, "metadata": {}, "score": score}
+
+
+def test_rerank_keeps_retrieval_score():
+    reranker = FakeReranker()
+    chunks = [make_chunk("a", "short", 0.9), make_chunk("b", "a much longer chunk of text", 0.75)]
+
+    reranked = asyncio.run(reranker.rerank("query", chunks, top_n=2))
+
+    assert [chunk["id"] for chunk in reranked] == ["b", "a"]
+    assert [chunk["score"] for chunk in reranked] == [0.75, 0.9]
+    assert reranked[1]["rerank_score"] < 0
+
+
+def test_rerank_cache_is_keyed_on_content():
+    reranker = FakeReranker()
+    asyncio.run(reranker.rerank("query", [make_chunk("a", "old text", 0.8)]))
+    asyncio.run(reranker.rerank("query", [make_chunk("a", "old text", 0.8)]))
+    assert reranker.scored == ["old text"]
+
+    # Re-ingested chunks keep their point id but must be scored again
+    asyncio.run(reranker.rerank("query", [make_chunk("a", "new text", 0.8)]))
+    assert reranker.scored == ["old text", "new text"]
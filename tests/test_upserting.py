@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from src.modules.rag.upserting import UpsertEngine
+
+
+class FakeVectorStore:
+    hybrid = False
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.batches = []
+
+    async def save_chunks(self, batch, wait=True):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("qdrant unavailable")
+        self.batches.append(batch)
+
+
+def make_chunk(chunk_order, text_size=100):
+    return {
+        "text": "x" * text_size,
+        "embedding": [0.1] * 8,
+        "metadata": {"file_id": "f", "chunk_order": chunk_order}
+    }
+
+
+@pytest.fixture
+def make_engine(settings_env):
+    settings_env.setenv("UPSERT_BACKOFF_SECONDS", "0")
+
+    def make(vector_store, **settings):
+        for name, value in settings.items():
+            settings_env.setenv(name, str(value))
+        return UpsertEngine(vector_store)
+
+    return make
+
+
+def test_batches_are_split_by_size(make_engine):
+    engine = make_engine(FakeVectorStore(), UPSERT_MAX_BATCH_BYTES=2000, UPSERT_MAX_BATCH_POINTS=100)
+    chunks = [make_chunk(i) for i in range(20)]
+    chunk_bytes = asyncio.run(engine.estimate_size(chunks[0]))
+
+    batches = asyncio.run(engine.make_batches(chunks))
+
+    assert [chunk for batch in batches for chunk in batch] == chunks
+    assert len(batches) > 1
+    assert all(len(batch) * chunk_bytes <= 2000 for batch in batches)
+
+
+def test_batches_are_split_by_point_count(make_engine):
+    engine = make_engine(FakeVectorStore(), UPSERT_MAX_BATCH_POINTS=3)
+    batches = asyncio.run(engine.make_batches([make_chunk(i) for i in range(7)]))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_oversized_chunk_gets_its_own_batch(make_engine):
+    engine = make_engine(FakeVectorStore(), UPSERT_MAX_BATCH_BYTES=1000)
+    batches = asyncio.run(engine.make_batches([make_chunk(0, 10), make_chunk(1, 5000), make_chunk(2, 10)]))
+    assert [[chunk["metadata"]["chunk_order"] for chunk in batch] for batch in batches] == [[0], [1], [2]]
+
+
+def test_transient_errors_are_retried(make_engine):
+    vector_store = FakeVectorStore(failures=2)
+    engine = make_engine(vector_store, UPSERT_MAX_TRIES=4)
+
+    report = asyncio.run(engine.upsert([make_chunk(i) for i in range(3)]))
+
+    assert report == {"upserted": 3, "failed": []}
+    assert vector_store.attempts == 3
+
+
+def test_batch_is_reported_failed_after_max_tries(make_engine):
+    vector_store = FakeVectorStore(failures=10)
+    engine = make_engine(vector_store, UPSERT_MAX_TRIES=2)
+
+    report = asyncio.run(engine.upsert([make_chunk(0), make_chunk(1)]))
+
+    assert report["upserted"] == 0
+    assert report["failed"] == [{"file_id": "f", "chunk_order": 0}, {"file_id": "f", "chunk_order": 1}]
+    assert vector_store.attempts == 2
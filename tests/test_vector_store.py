@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import PointStruct, SparseVector
+from src.models.VectorStoreModel import VectorStoreModel
+
+QUERY_VECTOR = [1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+
+def make_point(vector_store, point_id, vector, text):
+    sparse = vector_store.sparse_encoder.encode_document(text)
+    return PointStruct(
+        id=point_id,
+        vector={"": vector, vector_store.sparse_vector_name: SparseVector(**sparse)},
+        payload={"text": text, "file_id": "f", "course_id": "c", "file_name": "f.txt", "chunk_order": point_id}
+    )
+
+
+@pytest.fixture
+def vector_store(settings_env):
+    settings_env.setenv("HYBRID_SEARCH_ENABLED", "true")
+
+    async def create():
+        vector_store = await VectorStoreModel.create_instance(AsyncQdrantClient(":memory:"))
+        await vector_store.qdrant_client.upsert(vector_store.collection_name, points=[
+            # Close to the query vector but without the query terms
+            make_point(vector_store, 1, QUERY_VECTOR, "Sustainability generally matters"),
+            # Holds the exact terms, below the dense score threshold (cosine 0.6)
+            make_point(vector_store, 2, [0.6, 0.8, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], "The GHG Protocol Scope 3 standard"),
+            make_point(vector_store, 3, [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0], "Biodiversity loss threatens ecosystems")
+        ])
+        return vector_store
+
+    return asyncio.run(create())
+
+
+def test_hybrid_search_keeps_sparse_only_matches(vector_store):
+    assert vector_store.hybrid
+    chunks = asyncio.run(vector_store.search_similar_chunks(
+        QUERY_VECTOR, limit=5, score_threshold=0.7, query_text="GHG Protocol Scope 3"
+    ))
+
+    by_text = {chunk["text"]: chunk for chunk in chunks}
+    assert "The GHG Protocol Scope 3 standard" in by_text
+    assert "Biodiversity loss threatens ecosystems" not in by_text
+    # score stays the cosine, the fused rank score is reported separately
+    assert by_text["The GHG Protocol Scope 3 standard"]["score"] == pytest.approx(0.6, abs=1e-3)
+    assert by_text["Sustainability generally matters"]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert all("rrf_score" in chunk for chunk in chunks)
+
+
+def test_dense_search_applies_score_threshold(vector_store):
+    chunks = asyncio.run(vector_store.search_similar_chunks(QUERY_VECTOR, limit=5, score_threshold=0.7))
+    assert [chunk["text"] for chunk in chunks] == ["Sustainability generally matters"]